@@ -2,37 +2,214 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
 from django.contrib.auth import authenticate, login, logout
-from django.db.models import Q
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
 from datetime import date
 import json
 from django.utils import timezone
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.authentication import get_authorization_header
+from rest_framework.exceptions import PermissionDenied
 
 from .models import (
     User, Table, Floor, Room, menu_item, order, rating, bill,
-    Department, Role, Staff, Attendance, Leave
+    Department, Role, Staff, Attendance, Leave, PayrollRun
 )
+from .search import search_menu_ids, search_staff_ids
+from .menu_io import read_rows, import_menu, iter_menu_csv, iter_menu_json, MenuImportError
+from .pricing import price_order, PricingError, StaleCatalogError
+from .inventory import reserve_stock, OutOfStockError
+from .authentication import TOKEN_KEYWORD, is_staff_account, issue_staff_token, refresh_staff_token
+from .hr import (
+    BULK_REVIEW_LIMIT, LEAVE_DECISIONS, attendance_matrix, leave_calendar, parse_punches, review_leaves, sync_punches,
+)
+from .leave_index import OPEN_LEAVE_STATUSES, LeaveOverlapError, overlapping_leave_ids
+from .payroll import run_payroll
+from .exports import EXPORTS, EXPORT_CONTENT_TYPES, iter_export
+from .replica import reporting_alias, start_reporting_reads, stop_reporting_reads
+from .caches import resolve_qr, get_catalog, get_menu_data, get_menu_payload, get_menu_version, menu_etags
 from .serializers import (
     UserSerializer, TableSerializer, FloorSerializer, RoomSerializer, MenuItemSerializer, 
     OrderSerializer, RatingSerializer, BillSerializer, OrderCreateSerializer,
     DepartmentSerializer, RoleSerializer, StaffSerializer, StaffCreateSerializer,
-    AttendanceSerializer, LeaveSerializer
+    AttendanceSerializer, LeaveSerializer, PayrollRunSerializer, sparse_fieldset, keep_field, defer_unrequested
 )
 
 
-class MenuItemViewSet(viewsets.ModelViewSet):
+class SparseFieldsetViewMixin:
+    """Defer the columns a ``?fields=``/``?omit=`` response won't include"""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return defer_unrequested(queryset, self.get_serializer_class(), self.request)
+
+
+class IsCafeManager(permissions.BasePermission):
+    """Superusers and cafe managers only; anonymous users are refused, not errored on"""
+    message = 'Access denied'
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and (user.is_superuser or user.cafe_manager))
+
+
+class CanSyncAttendance(permissions.BasePermission):
+    """Superusers, cafe managers, and kiosk accounts in the ATTENDANCE_KIOSK_GROUP group"""
+    message = 'Only managers or attendance kiosk accounts can sync attendance'
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        if user.is_superuser or user.cafe_manager:
+            return True
+        return user.groups.filter(name=settings.ATTENDANCE_KIOSK_GROUP).exists()
+
+
+class ReportingReadsMixin:
+    """Serve the reads of ``reporting_actions`` from the reporting replica when it is fresh enough.
+
+    Switched on after authentication, so session and user lookups always hit the primary.
+    """
+    reporting_actions = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.reporting_actions:
+            self._reporting_token = start_reporting_reads()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, '_reporting_token', None)
+        if token is not None:
+            self._reporting_token = None
+            stop_reporting_reads(token)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class MenuItemViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = menu_item.objects.filter(is_available=True).order_by('category', 'name')
     serializer_class = MenuItemSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     
+    def get_permissions(self):
+        if self.action in ['export', 'import_items']:
+            return [IsCafeManager()]
+        return super().get_permissions()
+
     def get_queryset(self):
         queryset = menu_item.objects.filter(is_available=True).order_by('category', 'name')
         return queryset
 
+    def perform_authentication(self, request):
+        # The menu list is public; leave request.user lazy so cached answers skip the session lookup
+        if self.action != 'list':
+            super().perform_authentication(request)
+
+    def list(self, request, *args, **kwargs):
+        fields, omit = sparse_fieldset(request)
+        if fields is not None or omit:
+            # Sparse views are cut from the cached serialized menu, still without a query
+            version, data = get_menu_data(request)
+            response = Response([
+                {name: value for name, value in row.items() if keep_field(name, fields, omit)}
+                for row in data
+            ])
+            response['X-Menu-Version'] = version
+            return response
+
+        # Serve the pre-rendered menu for the current version; 304 when the client is current
+        use_gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+        version = get_menu_version()
+        etag, gzip_etag = menu_etags(request, version)
+        current_etag = gzip_etag if use_gzip else etag
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and (current_etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            payload = get_menu_payload(request)
+            if use_gzip:
+                response = HttpResponse(payload.gzip_body, content_type='application/json')
+                response['Content-Encoding'] = 'gzip'
+            else:
+                response = HttpResponse(payload.body, content_type='application/json')
+            current_etag = payload.gzip_etag if use_gzip else payload.etag
+            version = payload.version
+
+        response['ETag'] = current_etag
+        # Clients echo this back as catalog_version when placing an order
+        response['X-Menu-Version'] = version
+        response['Cache-Control'] = 'no-cache'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_items(self, request):
+        """Bulk create/update menu items from an uploaded CSV/JSON file or a JSON body"""
+        upload = request.FILES.get('file')
+        try:
+            if upload:
+                fmt = 'json' if upload.name.lower().endswith('.json') else 'csv'
+                rows = read_rows(upload.read(), fmt)
+            elif isinstance(request.data, (dict, list)):
+                # read_rows takes either {"items": [...]} or the bare list
+                rows = read_rows(request.data, 'json')
+            else:
+                return Response(
+                    {'error': 'Send a file upload, a JSON list of menu items or {"items": [...]}'},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            summary = import_menu(
+                rows,
+                delete_missing=str(request.query_params.get('delete_missing', '')).lower() in ('1', 'true'),
+                dry_run=str(request.query_params.get('dry_run', '')).lower() in ('1', 'true'),
+            )
+        except MenuImportError as ex:
+            return Response({'error': str(ex), 'errors': ex.errors}, status=status.HTTP_400_BAD_REQUEST)
+        except (ValueError, UnicodeDecodeError) as ex:
+            return Response({'error': f'Could not read import file: {ex}'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream every menu item (available or not) as CSV, or JSON with ?format=json"""
+        if request.query_params.get('format') == 'json':
+            response = StreamingHttpResponse(iter_menu_json(), content_type='application/json')
+            response['Content-Disposition'] = 'attachment; filename="menu.json"'
+        else:
+            response = StreamingHttpResponse(iter_menu_csv(), content_type='text/csv')
+            response['Content-Disposition'] = 'attachment; filename="menu.csv"'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Ranked prefix search over name, category and description"""
+        q = request.query_params.get('q', '').strip()
+        if not q:
+            return Response({'error': 'q parameter required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+            offset = max(int(request.query_params.get('offset', 0)), 0)
+        except ValueError:
+            return Response({'error': 'limit and offset must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        ids = search_menu_ids(q, limit=limit, offset=offset)
+        items = menu_item.objects.in_bulk(ids)
+        serializer = self.get_serializer([items[pk] for pk in ids if pk in items], many=True)
+        return Response({
+            'query': q,
+            'results': serializer.data,
+            'next_offset': offset + limit if len(ids) == limit else None,
+        })
+
 
-class FloorViewSet(viewsets.ModelViewSet):
+class FloorViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Floor.objects.all().order_by('name')
     serializer_class = FloorSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -44,9 +221,15 @@ class FloorViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         user = self.request.user
+        # Per-floor counts come from one grouped query instead of a COUNT per row
+        queryset = Floor.objects.annotate(
+            table_count=Count('tables', distinct=True),
+            active_table_count=Count('tables', filter=Q(tables__is_active=True), distinct=True),
+            room_count=Count('rooms', distinct=True),
+        ).order_by('name')
         if user.is_authenticated and (user.is_superuser or user.cafe_manager):
-            return Floor.objects.all().order_by('name')
-        return Floor.objects.filter(is_active=True).order_by('name')
+            return queryset
+        return queryset.filter(is_active=True)
     
     def perform_create(self, serializer):
         # Only superusers and cafe managers can create floors
@@ -67,7 +250,7 @@ class FloorViewSet(viewsets.ModelViewSet):
         instance.delete()
 
 
-class TableViewSet(viewsets.ModelViewSet):
+class TableViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Table.objects.all().order_by('table_number')
     serializer_class = TableSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -154,7 +337,7 @@ class TableViewSet(viewsets.ModelViewSet):
         return Response({'error': 'floor_id parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class RoomViewSet(viewsets.ModelViewSet):
+class RoomViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Room.objects.all().order_by('floor', 'room_number')
     serializer_class = RoomSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -271,7 +454,7 @@ class RoomViewSet(viewsets.ModelViewSet):
         return Response({'error': 'Floor parameter required'}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = order.objects.all().order_by('-created_at')
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -289,21 +472,23 @@ class OrderViewSet(viewsets.ModelViewSet):
             table_unique_id = data.get('table_unique_id')
             room_unique_id = data.get('room_unique_id')
             special_instructions = data.get('special_instructions', '')
-            total_amount = data.get('total_amount', 0)
+
+            # Price every line server-side from the cached catalog; client prices and totals are ignored
+            try:
+                priced = price_order(items, catalog_version=data.get('catalog_version'))
+            except StaleCatalogError as ex:
+                return Response(
+                    {'error': str(ex), 'catalog_version': ex.current_version, 'changed_lines': ex.changed_lines},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            except PricingError as ex:
+                return Response({'error': str(ex)}, status=status.HTTP_400_BAD_REQUEST)
 
             # Build items_json as { item_id: [quantity, name, price] }
-            items_map = {}
-            for item in items:
-                item_id = str(item.get('menu_item'))
-                quantity = int(item.get('quantity', 1))
-                price = float(item.get('price', 0))
-                # Fetch name for consistency (optional; fallback to id)
-                try:
-                    mi = menu_item.objects.get(id=item_id)
-                    name = mi.name
-                except menu_item.DoesNotExist:
-                    name = f"Item {item_id}"
-                items_map[item_id] = [quantity, name, price]
+            items_map = {
+                str(line.item_id): [line.quantity, line.name, float(line.unit_price)]
+                for line in priced.lines
+            }
 
             # Derive table/room display
             table_display = ''
@@ -311,59 +496,85 @@ class OrderViewSet(viewsets.ModelViewSet):
             table_number_for_bill = None
 
             if table_unique_id:
-                try:
-                    tbl = Table.objects.get(qr_unique_id=table_unique_id)
-                    table_display = tbl.table_number
-                    table_number_for_bill = tbl.table_number
-                except Table.DoesNotExist:
+                tbl = resolve_qr(table_unique_id, kind='table')
+                if tbl:
+                    table_display = tbl.number
+                    table_number_for_bill = tbl.number
+                else:
                     table_display = 'Unknown'
             elif room_unique_id:
-                try:
-                    rm = Room.objects.get(qr_unique_id=room_unique_id)
-                    table_display = f"Room {rm.room_number}"
+                rm = resolve_qr(room_unique_id, kind='room')
+                if rm:
+                    table_display = f"Room {rm.number}"
                     order_type_value = 'room'
-                except Room.DoesNotExist:
+                else:
                     table_display = 'Room'
 
-            # Create order
-            new_order = order.objects.create(
-                items_json=json.dumps(items_map),
-                name=data.get('name', 'Unknown'),
-                phone=data.get('phone', '0000000000'),
-                table=table_display,
-                price=total_amount or 0,
-                bill_clear=False,
-                estimated_time=20,
-                special_instructions=special_instructions,
-                status='pending',
-                table_unique_id=table_unique_id,
-                room_unique_id=room_unique_id,
-                order_type=order_type_value,
-            )
-
-            # Create bill entry
+            # Stock decrements, order and bill commit or roll back together
             try:
-                from django.utils import timezone
-                bill_items = {}
-                # For bill, use { item_name: [qty, total] }
-                for item_id, (qty, name, price) in items_map.items():
-                    bill_items[name] = [qty, int(round(qty * price))]
-
-                bill.objects.create(
-                    order_items=json.dumps(bill_items),
-                    name=new_order.name or 'Unknown',
-                    bill_total=int(round(float(new_order.price))),
-                    phone=new_order.phone or '0000000000',
-                    bill_time=timezone.now(),
-                    table_number=table_number_for_bill,
+                # Link orders placed from a customer account so its counter stays accurate;
+                # staff and managers entering orders for a table are not the customer
+                user = request.user
+                customer = user if user.is_authenticated and not is_staff_account(user) else None
+
+                with transaction.atomic():
+                    reserve_stock(priced.lines, get_catalog()[1])
+
+                    # Create order
+                    new_order = order.objects.create(
+                        items_json=json.dumps(items_map),
+                        name=data.get('name', 'Unknown'),
+                        phone=data.get('phone', '0000000000'),
+                        table=table_display,
+                        price=priced.total,
+                        bill_clear=False,
+                        estimated_time=20,
+                        special_instructions=special_instructions,
+                        status='pending',
+                        table_unique_id=table_unique_id,
+                        room_unique_id=room_unique_id,
+                        order_type=order_type_value,
+                        user=customer,
+                    )
+                    if customer is not None:
+                        User.objects.filter(pk=customer.pk).update(order_count=F('order_count') + 1)
+
+                    # Create bill entry
+                    try:
+                        with transaction.atomic():
+                            bill_items = {}
+                            # For bill, use { item_name: [qty, total] }
+                            for line in priced.lines:
+                                bill_items[line.name] = [line.quantity, int(round(line.line_total))]
+
+                            bill.objects.create(
+                                order_items=json.dumps(bill_items),
+                                name=new_order.name or 'Unknown',
+                                bill_total=int(round(priced.total)),
+                                phone=new_order.phone or '0000000000',
+                                bill_time=timezone.now(),
+                                table_number=table_number_for_bill,
+                            )
+                    except Exception:
+                        # Do not fail order creation if bill creation fails
+                        pass
+            except OutOfStockError as ex:
+                return Response(
+                    {'error': str(ex), 'menu_item': ex.item_id},
+                    status=status.HTTP_409_CONFLICT,
                 )
-            except Exception:
-                # Do not fail order creation if bill creation fails
-                pass
 
             serializer = self.get_serializer(new_order)
             headers = self.get_success_headers(serializer.data)
-            return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
+            response_data = dict(serializer.data)
+            response_data['pricing'] = {
+                'subtotal': priced.subtotal,
+                'tax': priced.tax,
+                'service_charge': priced.service_charge,
+                'total': priced.total,
+                'catalog_version': priced.catalog_version,
+            }
+            return Response(response_data, status=status.HTTP_201_CREATED, headers=headers)
         except Exception as ex:
             return Response({'error': str(ex)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -427,11 +638,13 @@ class OrderViewSet(viewsets.ModelViewSet):
         if not request.user.is_authenticated:
             return Response({'error': 'Authentication required'}, status=status.HTTP_401_UNAUTHORIZED)
         
-        # For regular users, filter by their phone number
+        # For regular users, their linked orders plus older unlinked ones placed with their phone number
         if request.user.is_superuser or request.user.cafe_manager:
             user_orders = order.objects.all().order_by('-created_at')
         else:
-            user_orders = order.objects.filter(phone=request.user.phone).order_by('-created_at')
+            user_orders = order.objects.filter(
+                Q(user=request.user) | Q(user__isnull=True, phone=request.user.phone)
+            ).order_by('-created_at')
         
         serializer = self.get_serializer(user_orders, many=True)
         return Response(serializer.data)
@@ -466,7 +679,7 @@ class OrderViewSet(viewsets.ModelViewSet):
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-class RatingViewSet(viewsets.ModelViewSet):
+class RatingViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = rating.objects.all().order_by('-r_date')
     serializer_class = RatingSerializer
     
@@ -488,9 +701,40 @@ class RatingViewSet(viewsets.ModelViewSet):
         serializer.save(name=user_name)
 
 
-class BillViewSet(viewsets.ReadOnlyModelViewSet):
+def load_staff_profile(user):
+    """Attach the user's staff profile, with department and role, in one query"""
+    staff = Staff.objects.select_related('department', 'role').filter(user_id=user.pk).first()
+    User.staff_profile.related.set_cached_value(user, staff)
+    return user
+
+
+def filter_bills_by_qr(queryset, table_unique_id=None, room_unique_id=None):
+    """Narrow a bill queryset to a table or room QR session"""
+    if table_unique_id:
+        # Get the table number for this unique ID
+        table = resolve_qr(table_unique_id, kind='table')
+        if table:
+            # Filter bills by table number
+            queryset = queryset.filter(table_number=table.number)
+        else:
+            # Fallback to phone number filtering
+            table_orders = order.objects.filter(table_unique_id=table_unique_id)
+            phone_numbers = table_orders.values_list('phone', flat=True).distinct()
+            queryset = queryset.filter(phone__in=phone_numbers)
+
+    if room_unique_id:
+        # Bills don't have room numbers, so rooms (known or not) filter by phone numbers
+        room_orders = order.objects.filter(room_unique_id=room_unique_id)
+        phone_numbers = room_orders.values_list('phone', flat=True).distinct()
+        queryset = queryset.filter(phone__in=phone_numbers)
+
+    return queryset
+
+
+class BillViewSet(ReportingReadsMixin, SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     queryset = bill.objects.all().order_by('-bill_time')
     serializer_class = BillSerializer
+    reporting_actions = ('list',)
     
     def get_permissions(self):
         if self.action in ['list', 'retrieve']:
@@ -500,35 +744,12 @@ class BillViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         queryset = super().get_queryset()
         
-        # Filter by table_unique_id if provided
-        table_unique_id = self.request.query_params.get('table_unique_id')
-        if table_unique_id:
-            # Get the table number for this unique ID
-            try:
-                table = Table.objects.get(qr_unique_id=table_unique_id)
-                # Filter bills by table number
-                queryset = queryset.filter(table_number=table.table_number)
-            except Table.DoesNotExist:
-                # Fallback to phone number filtering
-                table_orders = order.objects.filter(table_unique_id=table_unique_id)
-                phone_numbers = table_orders.values_list('phone', flat=True).distinct()
-                queryset = queryset.filter(phone__in=phone_numbers)
-        
-        # Filter by room_unique_id if provided
-        room_unique_id = self.request.query_params.get('room_unique_id')
-        if room_unique_id:
-            # Get the room number for this unique ID
-            try:
-                room = Room.objects.get(qr_unique_id=room_unique_id)
-                # For rooms, we'll filter by phone numbers since bills don't have room numbers
-                room_orders = order.objects.filter(room_unique_id=room_unique_id)
-                phone_numbers = room_orders.values_list('phone', flat=True).distinct()
-                queryset = queryset.filter(phone__in=phone_numbers)
-            except Room.DoesNotExist:
-                # Fallback to phone number filtering
-                room_orders = order.objects.filter(room_unique_id=room_unique_id)
-                phone_numbers = room_orders.values_list('phone', flat=True).distinct()
-                queryset = queryset.filter(phone__in=phone_numbers)
+        # Filter by table_unique_id / room_unique_id if provided
+        queryset = filter_bills_by_qr(
+            queryset,
+            table_unique_id=self.request.query_params.get('table_unique_id'),
+            room_unique_id=self.request.query_params.get('room_unique_id'),
+        )
         
         # Also support direct table_number filtering
         table_number = self.request.query_params.get('table_number')
@@ -538,6 +759,63 @@ class BillViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
+def _without_phone(row):
+    return {name: value for name, value in row.items() if name != 'phone'}
+
+
+class SessionViewSet(viewsets.ViewSet):
+    permission_classes = [permissions.AllowAny]
+    # Most bills a bootstrap returns; only the open session's bills are sent at all
+    bootstrap_bill_limit = 20
+
+    @action(detail=False, methods=['get'])
+    def bootstrap(self, request):
+        """Everything a guest screen needs after scanning a QR code, in one response"""
+        table_unique_id = request.query_params.get('table')
+        room_unique_id = request.query_params.get('room')
+        qr_unique_id = table_unique_id or room_unique_id
+        if not qr_unique_id:
+            return Response({'error': 'table or room parameter required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        target = resolve_qr(qr_unique_id, kind='table' if table_unique_id else 'room')
+        if target is None:
+            return Response({'error': 'Unknown table or room'}, status=status.HTTP_404_NOT_FOUND)
+
+        menu_version, menu_data = get_menu_data(request)
+
+        if target.kind == 'table':
+            open_orders = order.objects.filter(table_unique_id=qr_unique_id, bill_clear=False)
+            bills = filter_bills_by_qr(bill.objects.all(), table_unique_id=qr_unique_id)
+        else:
+            open_orders = order.objects.filter(room_unique_id=qr_unique_id, bill_clear=False)
+            bills = filter_bills_by_qr(bill.objects.all(), room_unique_id=qr_unique_id)
+
+        # Only bills from the current sitting: none once the table is cleared, so
+        # earlier guests' bills are never shown to whoever scans the code next
+        open_since = open_orders.order_by('created_at').values_list('created_at', flat=True).first()
+        if open_since is None:
+            bills = bill.objects.none()
+        else:
+            bills = bills.filter(bill_time__gte=open_since).order_by('-bill_time')[:self.bootstrap_bill_limit]
+        open_orders = open_orders.order_by('-created_at')
+
+        return Response({
+            'target': {
+                'kind': target.kind,
+                'id': target.pk,
+                'number': target.number,
+                'floor': target.floor_id,
+                'is_active': target.is_active,
+                'qr_unique_id': qr_unique_id,
+            },
+            'menu_version': menu_version,
+            'menu': menu_data,
+            # Phone numbers stay out of an anonymous response
+            'orders': [_without_phone(row) for row in OrderSerializer(open_orders, many=True).data],
+            'bills': [_without_phone(row) for row in BillSerializer(bills, many=True).data],
+        })
+
+
 class AuthViewSet(viewsets.ViewSet):
     permission_classes = [permissions.AllowAny]
     
@@ -549,7 +827,7 @@ class AuthViewSet(viewsets.ViewSet):
         user = authenticate(phone=phone, password=password)
         if user:
             login(request, user)
-            serializer = UserSerializer(user)
+            serializer = UserSerializer(load_staff_profile(user))
             return Response(serializer.data)
         return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
     
@@ -577,16 +855,45 @@ class AuthViewSet(viewsets.ViewSet):
         serializer = UserSerializer(user)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
+    @action(detail=False, methods=['post'])
+    def token(self, request):
+        """Issue a signed bearer token for a staff device, from credentials or the current session"""
+        user = request.user
+        if request.data.get('phone'):
+            user = authenticate(phone=request.data.get('phone'), password=request.data.get('password'))
+        if not user or not user.is_authenticated:
+            return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+        if not is_staff_account(user):
+            return Response({'error': 'Tokens are only issued to staff accounts'}, status=status.HTTP_403_FORBIDDEN)
+
+        token, expires_in = issue_staff_token(user)
+        return Response({'token': token, 'token_type': TOKEN_KEYWORD, 'expires_in': expires_in})
+
+    @action(detail=False, methods=['post'], url_path='token/refresh', authentication_classes=[])
+    def refresh_token(self, request):
+        # Authentication is skipped so an expired-but-refreshable token isn't rejected up front
+        token = request.data.get('token')
+        if not token:
+            header = get_authorization_header(request).split()
+            if len(header) == 2 and header[0].lower() == TOKEN_KEYWORD.lower().encode():
+                token = header[1].decode(errors='ignore')
+        if not token:
+            return Response({'error': 'Token is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        _user, (token, expires_in) = refresh_staff_token(token)
+        return Response({'token': token, 'token_type': TOKEN_KEYWORD, 'expires_in': expires_in})
+
     @action(detail=False, methods=['get'])
     def current_user(self, request):
         if request.user.is_authenticated:
-            serializer = UserSerializer(request.user)
+            serializer = UserSerializer(load_staff_profile(request.user))
             return Response(serializer.data)
         return Response({'error': 'Not authenticated'}, status=status.HTTP_401_UNAUTHORIZED)
 
 
-class DashboardViewSet(viewsets.ViewSet):
+class DashboardViewSet(ReportingReadsMixin, viewsets.ViewSet):
     permission_classes = [permissions.IsAuthenticated]
+    reporting_actions = ('stats',)
     
     @action(detail=False, methods=['get'])
     def stats(self, request):
@@ -598,7 +905,7 @@ class DashboardViewSet(viewsets.ViewSet):
         total_tables = Table.objects.filter(is_active=True).count()
         
         # Calculate total revenue
-        total_revenue = sum(bill.bill_total for bill in bill.objects.all())
+        total_revenue = bill.objects.aggregate(total=Sum('bill_total'))['total'] or 0
         
         # Get recent orders (last 5)
         recent_orders = order.objects.all().order_by('-created_at')[:5]
@@ -631,7 +938,40 @@ class DashboardViewSet(viewsets.ViewSet):
         })
 
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+class ExportViewSet(viewsets.ViewSet):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def list(self, request):
+        if not (request.user.is_superuser or request.user.cafe_manager):
+            return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+        return Response({'exports': list(EXPORTS), 'types': list(EXPORT_CONTENT_TYPES)})
+
+    def retrieve(self, request, pk=None):
+        """Stream one export as ?type=csv (default) or xlsx, optionally limited to ?from= / ?to= (YYYY-MM-DD)"""
+        if not (request.user.is_superuser or request.user.cafe_manager):
+            return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
+        if pk not in EXPORTS:
+            return Response({'error': f"Unknown export; choose one of: {', '.join(EXPORTS)}"}, status=status.HTTP_404_NOT_FOUND)
+
+        # ?format= is taken by DRF content negotiation, hence ?type=
+        export_type = request.query_params.get('type', 'csv')
+        if export_type not in EXPORT_CONTENT_TYPES:
+            return Response({'error': 'type must be csv or xlsx'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            start = date.fromisoformat(request.query_params['from']) if request.query_params.get('from') else None
+            end = date.fromisoformat(request.query_params['to']) if request.query_params.get('to') else None
+        except ValueError:
+            return Response({'error': 'from and to must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # The rows are read while the response streams, after the view has returned,
+        # so the database is picked here rather than by ReportingReadsMixin
+        rows = iter_export(pk, export_type, start, end, using=reporting_alias())
+        response = StreamingHttpResponse(rows, content_type=EXPORT_CONTENT_TYPES[export_type])
+        response['Content-Disposition'] = f'attachment; filename="{pk}.{export_type}"'
+        return response
+
+
+class DepartmentViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Department.objects.all().order_by('name')
     serializer_class = DepartmentSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -643,9 +983,10 @@ class DepartmentViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        queryset = Department.objects.annotate(staff_count=Count('staff')).order_by('name')
         if user.is_authenticated and (user.is_superuser or user.cafe_manager):
-            return Department.objects.all().order_by('name')
-        return Department.objects.filter(is_active=True).order_by('name')
+            return queryset
+        return queryset.filter(is_active=True)
 
     def perform_create(self, serializer):
         if not (self.request.user.is_superuser or self.request.user.cafe_manager):
@@ -662,7 +1003,7 @@ class DepartmentViewSet(viewsets.ModelViewSet):
             raise permissions.PermissionDenied("Only administrators can delete departments")
         instance.delete()
 
-class RoleViewSet(viewsets.ModelViewSet):
+class RoleViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Role.objects.all().order_by('department', 'name')
     serializer_class = RoleSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -702,7 +1043,7 @@ class RoleViewSet(viewsets.ModelViewSet):
             return Response(serializer.data)
         return Response({'error': 'Department parameter required'}, status=status.HTTP_400_BAD_REQUEST)
 
-class StaffViewSet(viewsets.ModelViewSet):
+class StaffViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Staff.objects.all().order_by('employee_id')
     serializer_class = StaffSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -719,9 +1060,11 @@ class StaffViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
+        # The nested user serializer reads staff_profile, department and role; load them in the same query
+        queryset = Staff.objects.select_related('user', 'department', 'role').order_by('employee_id')
         if user.is_authenticated and (user.is_superuser or user.cafe_manager):
-            return Staff.objects.all().order_by('employee_id')
-        return Staff.objects.filter(is_active=True).order_by('employee_id')
+            return queryset
+        return queryset.filter(is_active=True)
 
     def perform_create(self, serializer):
         if not (self.request.user.is_superuser or self.request.user.cafe_manager):
@@ -738,25 +1081,62 @@ class StaffViewSet(viewsets.ModelViewSet):
             raise permissions.PermissionDenied("Only administrators can delete staff")
         instance.delete()
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Ranked prefix search over employee id, name, phone and email"""
+        q = request.query_params.get('q', '').strip()
+        if not q:
+            return Response({'error': 'q parameter required'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+            offset = max(int(request.query_params.get('offset', 0)), 0)
+        except ValueError:
+            return Response({'error': 'limit and offset must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = request.user
+        active_only = not (user.is_authenticated and (user.is_superuser or user.cafe_manager))
+        ids = search_staff_ids(q, limit=limit, offset=offset, active_only=active_only)
+        staff = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer([staff[pk] for pk in ids if pk in staff], many=True)
+        return Response({
+            'query': q,
+            'results': serializer.data,
+            'next_offset': offset + limit if len(ids) == limit else None,
+        })
+
     @action(detail=False, methods=['get'])
     def by_department(self, request):
         department_id = request.query_params.get('department')
         if department_id:
-            staff = Staff.objects.filter(department_id=department_id).order_by('employee_id')
+            staff = (
+                Staff.objects.select_related('user', 'department', 'role')
+                .filter(department_id=department_id)
+                .order_by('employee_id')
+            )
             serializer = self.get_serializer(staff, many=True)
             return Response(serializer.data)
         return Response({'error': 'Department parameter required'}, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=['get'])
     def active_staff(self, request):
-        staff = Staff.objects.filter(employment_status='active', is_active=True).order_by('employee_id')
+        staff = (
+            Staff.objects.select_related('user', 'department', 'role')
+            .filter(employment_status='active', is_active=True)
+            .order_by('employee_id')
+        )
         serializer = self.get_serializer(staff, many=True)
         return Response(serializer.data)
 
-class AttendanceViewSet(viewsets.ModelViewSet):
+class AttendanceViewSet(ReportingReadsMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Attendance.objects.all().order_by('-date', '-created_at')
     serializer_class = AttendanceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    reporting_actions = ('matrix',)
+
+    def get_permissions(self):
+        if self.action == 'sync':
+            return [CanSyncAttendance()]
+        return super().get_permissions()
 
     def get_queryset(self):
         user = self.request.user
@@ -797,6 +1177,31 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         else:
             instance.delete()
 
+    @action(detail=False, methods=['get'])
+    def matrix(self, request):
+        """Staff x day status grid for ?month=YYYY-MM, optionally for one ?department="""
+        if not (request.user.is_superuser or request.user.cafe_manager):
+            return Response({'error': 'Only administrators can view the attendance matrix'}, status=status.HTTP_403_FORBIDDEN)
+
+        month = request.query_params.get('month') or date.today().strftime('%Y-%m')
+        department = request.query_params.get('department')
+        if department and not department.isdigit():
+            return Response({'error': 'department must be a department id'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            data = attendance_matrix(month, department_id=department)
+        except ValueError:
+            return Response({'error': 'month must be YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data)
+
+    @action(detail=False, methods=['post'])
+    def sync(self, request):
+        """Upsert a batch of kiosk clock events: {"punches": [{"employee_id", "type": "in" | "out", "timestamp"}]}"""
+        try:
+            punches = parse_punches(request.data.get('punches'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(sync_punches(punches))
+
     @action(detail=False, methods=['post'])
     def check_in(self, request):
         if not hasattr(request.user, 'staff_profile'):
@@ -832,7 +1237,7 @@ class AttendanceViewSet(viewsets.ModelViewSet):
         except Attendance.DoesNotExist:
             return Response({'error': 'No attendance record found for today'}, status=status.HTTP_400_BAD_REQUEST)
 
-class LeaveViewSet(viewsets.ModelViewSet):
+class LeaveViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = Leave.objects.all().order_by('-start_date')
     serializer_class = LeaveSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -846,26 +1251,71 @@ class LeaveViewSet(viewsets.ModelViewSet):
             return Leave.objects.filter(staff=user.staff_profile).order_by('-start_date')
         return Leave.objects.none()
 
+    def _reject_overlap(self, staff_id, data, instance=None):
+        # Answered from the leave interval index rather than scanning every leave
+        start_date = data.get('start_date', getattr(instance, 'start_date', None))
+        end_date = data.get('end_date', getattr(instance, 'end_date', None))
+        leave_status = data.get('status', getattr(instance, 'status', 'pending'))
+        if leave_status not in OPEN_LEAVE_STATUSES:
+            return
+        conflicts = overlapping_leave_ids(
+            start_date, end_date, staff_id=staff_id, exclude_id=getattr(instance, 'pk', None)
+        )
+        if conflicts:
+            raise LeaveOverlapError(conflicts)
+
+    def handle_exception(self, exc):
+        # Answered here rather than as a ValidationError, which would turn the ids into strings
+        if isinstance(exc, LeaveOverlapError):
+            return Response(
+                {'error': str(exc), 'conflicting_leaves': exc.leave_ids}, status=status.HTTP_400_BAD_REQUEST
+            )
+        return super().handle_exception(exc)
+
     def perform_create(self, serializer):
         if not (self.request.user.is_superuser or self.request.user.cafe_manager):
             # Staff can only create their own leaves
             if hasattr(self.request.user, 'staff_profile'):
+                self._reject_overlap(self.request.user.staff_profile.pk, serializer.validated_data)
                 serializer.save(staff=self.request.user.staff_profile)
             else:
                 raise permissions.PermissionDenied("You can only create your own leave requests")
         else:
+            self._reject_overlap(serializer.validated_data['staff'].pk, serializer.validated_data)
             serializer.save()
 
     def perform_update(self, serializer):
+        staff = serializer.validated_data.get('staff', serializer.instance.staff)
         if not (self.request.user.is_superuser or self.request.user.cafe_manager):
             # Staff can only update their own leaves
             if hasattr(self.request.user, 'staff_profile') and serializer.instance.staff == self.request.user.staff_profile:
+                self._reject_overlap(serializer.instance.staff_id, serializer.validated_data, serializer.instance)
                 serializer.save()
             else:
                 raise permissions.PermissionDenied("You can only update your own leave requests")
         else:
+            self._reject_overlap(staff.pk, serializer.validated_data, serializer.instance)
             serializer.save()
 
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """Who's out between ?from= and ?to= (YYYY-MM-DD), per department"""
+        if not (request.user.is_superuser or request.user.cafe_manager):
+            return Response({'error': 'Only administrators can view the leave calendar'}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            start = date.fromisoformat(request.query_params.get('from') or date.today().isoformat())
+            end = date.fromisoformat(request.query_params.get('to') or (start + timedelta(days=30)).isoformat())
+        except ValueError:
+            return Response({'error': 'from and to must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        if end < start or (end - start).days > 366:
+            return Response({'error': 'to must be on or after from, at most a year later'}, status=status.HTTP_400_BAD_REQUEST)
+
+        department = request.query_params.get('department')
+        if department and not department.isdigit():
+            return Response({'error': 'department must be a department id'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(leave_calendar(start, end, department_id=department))
+
     def perform_destroy(self, instance):
         if not (self.request.user.is_superuser or self.request.user.cafe_manager):
             # Staff can only delete their own leaves
@@ -903,3 +1353,52 @@ class LeaveViewSet(viewsets.ModelViewSet):
         
         serializer = self.get_serializer(leave)
         return Response(serializer.data)
+
+    @action(detail=False, methods=['post'], url_path='bulk_review')
+    def bulk_review(self, request):
+        """Approve or reject a list of pending leaves: {"ids": [...], "decision": "approve" | "reject"}"""
+        if not (request.user.is_superuser or request.user.cafe_manager):
+            return Response({'error': 'Only administrators can review leaves'}, status=status.HTTP_403_FORBIDDEN)
+
+        decision = request.data.get('decision')
+        if decision not in LEAVE_DECISIONS:
+            return Response({'error': f"decision must be one of: {', '.join(LEAVE_DECISIONS)}"}, status=status.HTTP_400_BAD_REQUEST)
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids or not all(isinstance(leave_id, int) and not isinstance(leave_id, bool) for leave_id in ids):
+            return Response({'error': 'ids must be a non-empty list of leave ids'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > BULK_REVIEW_LIMIT:
+            return Response({'error': f'At most {BULK_REVIEW_LIMIT} leaves can be reviewed at once'}, status=status.HTTP_400_BAD_REQUEST)
+
+        reviewer = request.user.staff_profile if hasattr(request.user, 'staff_profile') else None
+        return Response(review_leaves(ids, decision, reviewer=reviewer))
+
+
+class PayrollRunViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = PayrollRun.objects.all().order_by('-created_at')
+    serializer_class = PayrollRunSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        user = self.request.user
+        if not (user.is_superuser or user.cafe_manager):
+            raise PermissionDenied("Only administrators can view payroll")
+        queryset = PayrollRun.objects.all().order_by('-created_at')
+        month = self.request.query_params.get('month')
+        if month:
+            queryset = queryset.filter(month=month)
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        """Compute a month's payroll and store it; ``dry_run`` returns it without saving"""
+        if not (request.user.is_superuser or request.user.cafe_manager):
+            raise PermissionDenied("Only administrators can run payroll")
+
+        month = request.data.get('month') or date.today().strftime('%Y-%m')
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        try:
+            run = run_payroll(month, user=request.user, dry_run=dry_run)
+        except ValueError:
+            return Response({'error': 'month must be YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(run)
+        return Response(serializer.data, status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED)
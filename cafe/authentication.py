@@ -0,0 +1,129 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.utils.crypto import constant_time_compare, salted_hmac
+from rest_framework import authentication, exceptions
+
+
+TOKEN_SALT = 'cafe.staff-token'
+TOKEN_KEYWORD = 'Bearer'
+
+# Claims carried in the token; enough to answer every admin/manager check without a query
+USER_CLAIM_FIELDS = ('id', 'is_active', 'is_superuser', 'is_staff', 'cafe_manager')
+
+
+def is_staff_account(user):
+    """Superusers, managers, Django staff and users with a staff profile; everyone else is a customer"""
+    return bool(
+        user.is_superuser or user.is_staff or user.cafe_manager or hasattr(user, 'staff_profile')
+    )
+
+
+def customer_accounts():
+    """Users that is_staff_account() is false for, as a queryset"""
+    return get_user_model().objects.filter(
+        is_superuser=False, is_staff=False, cafe_manager=False, staff_profile__isnull=True,
+    )
+
+
+def _password_fingerprint(user):
+    """Short HMAC of the password hash so a password change stops refreshes"""
+    return salted_hmac(TOKEN_SALT, user.password, algorithm='sha256').hexdigest()[:16]
+
+
+def issue_staff_token(user):
+    """Sign a short-lived access token for ``user``; returns (token, expires_in seconds)"""
+    from .models import Staff
+
+    staff_id = Staff.objects.filter(user_id=user.pk).values_list('id', flat=True).first()
+    payload = {
+        'uid': user.pk,
+        'su': user.is_superuser,
+        'st': user.is_staff,
+        'cm': user.cafe_manager,
+        'sid': staff_id,
+        'pwd': _password_fingerprint(user),
+    }
+    return signing.dumps(payload, salt=TOKEN_SALT, compress=True), settings.STAFF_TOKEN_TTL
+
+
+def read_staff_token(token, max_age):
+    try:
+        return signing.loads(token, salt=TOKEN_SALT, max_age=max_age)
+    except signing.SignatureExpired:
+        raise exceptions.AuthenticationFailed('Token has expired')
+    except signing.BadSignature:
+        raise exceptions.AuthenticationFailed('Invalid token')
+
+
+def refresh_staff_token(token):
+    """Re-issue a token that is still within the refresh window.
+
+    This is the only point where the user row is re-read, so deactivated users,
+    changed role flags and password changes take effect here.
+    """
+    payload = read_staff_token(token, settings.STAFF_TOKEN_REFRESH_WINDOW)
+    user = get_user_model().objects.filter(pk=payload.get('uid'), is_active=True).first()
+    if user is None or not constant_time_compare(payload.get('pwd', ''), _password_fingerprint(user)):
+        raise exceptions.AuthenticationFailed('Token can no longer be refreshed')
+    if not is_staff_account(user):
+        raise exceptions.AuthenticationFailed('Token can no longer be refreshed')
+    return user, issue_staff_token(user)
+
+
+def _load_deferred_together(instance):
+    """Make the first read of a deferred field load every remaining column in one query"""
+    refresh = instance.refresh_from_db
+
+    def refresh_from_db(using=None, fields=None, from_queryset=None):
+        deferred = instance.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        return refresh(using=using, fields=fields, from_queryset=from_queryset)
+
+    instance.refresh_from_db = refresh_from_db
+    return instance
+
+
+def token_user(payload):
+    """Build a User from token claims without touching the database.
+
+    The instance is a real model instance with every other field deferred, so
+    it works in ORM filters and loads the remaining columns (in one query) only
+    if a view reads them. ``staff_profile`` is primed the same way from the
+    staff id claim.
+    """
+    from .models import Staff
+
+    User = get_user_model()
+    user = _load_deferred_together(User.from_db(
+        None, list(USER_CLAIM_FIELDS),
+        [payload['uid'], True, payload.get('su', False), payload.get('st', False), payload.get('cm', False)],
+    ))
+    staff = None
+    if payload.get('sid') is not None:
+        staff = _load_deferred_together(Staff.from_db(None, ['id', 'user_id'], [payload['sid'], payload['uid']]))
+        Staff.user.field.set_cached_value(staff, user)
+    User.staff_profile.related.set_cached_value(user, staff)
+    return user
+
+
+class SignedTokenAuthentication(authentication.BaseAuthentication):
+    """``Authorization: Bearer <token>`` for staff devices, verified without a database hit"""
+
+    def authenticate(self, request):
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() != TOKEN_KEYWORD.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header')
+        try:
+            token = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed('Invalid token header')
+
+        payload = read_staff_token(token, settings.STAFF_TOKEN_TTL)
+        return token_user(payload), payload
+
+    def authenticate_header(self, request):
+        return TOKEN_KEYWORD
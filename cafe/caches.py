@@ -0,0 +1,195 @@
+import gzip
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+
+# Everything below that fills a shared cache reads from DEFAULT_DB_ALIAS: cache
+# invalidation runs on primary writes, so an entry read from a lagging reporting
+# replica would outlive the invalidation that was meant to clear it.
+
+# Resolved identity of a table or room QR code
+QRTarget = namedtuple('QRTarget', ['kind', 'pk', 'number', 'floor_id', 'is_active'])
+
+# Cached marker for QR ids that matched neither a table nor a room
+_MISSING = object()
+
+
+class QRResolverCache:
+    """In-process LRU of qr_unique_id -> QRTarget, including negative results"""
+
+    def __init__(self, maxsize=2048, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._keys_by_pk = {}
+        self._lock = threading.Lock()
+
+    def get(self, qr_unique_id):
+        with self._lock:
+            entry = self._entries.get(qr_unique_id)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                self._discard(qr_unique_id)
+                return None
+            self._entries.move_to_end(qr_unique_id)
+            return value
+
+    def set(self, qr_unique_id, value):
+        with self._lock:
+            self._discard(qr_unique_id)
+            self._entries[qr_unique_id] = (value, time.monotonic() + self.ttl)
+            if value is not _MISSING:
+                self._keys_by_pk[(value.kind, value.pk)] = qr_unique_id
+            while len(self._entries) > self.maxsize:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+
+    def invalidate(self, kind, pk, qr_unique_id=None):
+        with self._lock:
+            previous = self._keys_by_pk.get((kind, pk))
+            if previous is not None:
+                self._discard(previous)
+            if qr_unique_id:
+                self._discard(str(qr_unique_id))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_pk.clear()
+
+    def _discard(self, qr_unique_id):
+        entry = self._entries.pop(qr_unique_id, None)
+        if entry is not None and entry[0] is not _MISSING:
+            self._keys_by_pk.pop((entry[0].kind, entry[0].pk), None)
+
+
+qr_cache = QRResolverCache(
+    maxsize=getattr(settings, 'QR_RESOLVER_CACHE_SIZE', 2048),
+    ttl=getattr(settings, 'QR_RESOLVER_CACHE_TTL', 300),
+)
+
+
+def resolve_qr(qr_unique_id, kind=None):
+    """Resolve a table or room QR id, hitting the database only on a cache miss.
+
+    Returns a QRTarget, or None when the id is unknown (or belongs to the
+    other kind when ``kind`` is given).
+    """
+    from .models import Table, Room
+
+    if not qr_unique_id:
+        return None
+    qr_unique_id = str(qr_unique_id)
+
+    target = qr_cache.get(qr_unique_id)
+    if target is None:
+        target = _MISSING
+        row = (
+            Table.objects.using(DEFAULT_DB_ALIAS).filter(qr_unique_id=qr_unique_id)
+            .values_list('pk', 'table_number', 'floor_id', 'is_active')
+            .first()
+        )
+        if row is not None:
+            target = QRTarget('table', *row)
+        else:
+            row = (
+                Room.objects.using(DEFAULT_DB_ALIAS).filter(qr_unique_id=qr_unique_id)
+                .values_list('pk', 'room_number', 'floor_id', 'is_active')
+                .first()
+            )
+            if row is not None:
+                target = QRTarget('room', *row)
+        qr_cache.set(qr_unique_id, target)
+
+    if target is _MISSING or (kind is not None and target.kind != kind):
+        return None
+    return target
+
+
+MENU_VERSION_KEY = 'cafe:menu_version'
+
+# Serialized menu for one (version, host); image URLs are absolute per host
+MenuPayload = namedtuple('MenuPayload', ['version', 'data', 'body', 'gzip_body', 'etag', 'gzip_etag'])
+
+_menu_payloads = {}
+_menu_lock = threading.Lock()
+
+
+def get_menu_version():
+    """Current menu version token, shared across processes via the cache backend"""
+    return cache.get_or_set(MENU_VERSION_KEY, lambda: uuid.uuid4().hex, timeout=None)
+
+
+def bump_menu_version():
+    version = uuid.uuid4().hex
+    cache.set(MENU_VERSION_KEY, version, timeout=None)
+    return version
+
+
+def menu_etags(request, version):
+    """Strong ETags for the identity and gzip representations, computable without the DB"""
+    host = hashlib.md5(request.build_absolute_uri('/').encode()).hexdigest()[:8]
+    return f'"menu-{version}-{host}"', f'"menu-{version}-{host}-gz"'
+
+
+def get_menu_payload(request):
+    """Return the MenuPayload for the current version, building it once per version and host"""
+    from rest_framework.renderers import JSONRenderer
+    from .models import menu_item
+    from .serializers import MenuItemSerializer
+
+    version = get_menu_version()
+    key = (version, request.build_absolute_uri('/'))
+    payload = _menu_payloads.get(key)
+    if payload is None:
+        items = menu_item.objects.using(DEFAULT_DB_ALIAS).filter(is_available=True).order_by('category', 'name')
+        data = MenuItemSerializer(items, many=True, context={'request': request}).data
+        body = JSONRenderer().render(data)
+        payload = MenuPayload(
+            version, data, body, gzip.compress(body, mtime=0), *menu_etags(request, version)
+        )
+        with _menu_lock:
+            for stale in [k for k in _menu_payloads if k[0] != version]:
+                del _menu_payloads[stale]
+            _menu_payloads[key] = payload
+    return payload
+
+
+def get_menu_data(request):
+    """Return (version, serialized available menu items)"""
+    payload = get_menu_payload(request)
+    return payload.version, payload.data
+
+
+# Pricing view of one menu item; the catalog snapshot maps menu_item id -> CatalogEntry
+CatalogEntry = namedtuple('CatalogEntry', ['name', 'price', 'is_available', 'stock_tracked'])
+
+# (version, items) swapped as a whole so readers never mix versions
+_catalog = (None, {})
+
+
+def get_catalog():
+    """Return (version, {id: CatalogEntry}) for every menu item, one query per menu version"""
+    global _catalog
+    from .models import menu_item
+
+    version = get_menu_version()
+    snapshot = _catalog
+    if snapshot[0] != version:
+        items = {
+            pk: CatalogEntry(name, price, is_available, stock is not None)
+            for pk, name, price, is_available, stock in menu_item.objects.using(DEFAULT_DB_ALIAS).values_list(
+                'id', 'name', 'price', 'is_available', 'stock'
+            )
+        }
+        snapshot = _catalog = (version, items)
+    return snapshot
@@ -0,0 +1,245 @@
+import csv
+import re
+import zipfile
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+from .models import Attendance, Leave, bill, order
+
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+def _day_bounds(field, start, end):
+    """Inclusive date range on a DateTimeField, as index-friendly >= / < bounds"""
+    lookups = {}
+    if start:
+        lookups[f'{field}__gte'] = timezone.make_aware(datetime.combine(start, time.min))
+    if end:
+        lookups[f'{field}__lt'] = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+    return lookups
+
+
+def _date_range(field, start, end):
+    lookups = {}
+    if start:
+        lookups[f'{field}__gte'] = start
+    if end:
+        lookups[f'{field}__lte'] = end
+    return lookups
+
+
+def _leave_overlap(start, end):
+    lookups = {}
+    if start:
+        lookups['end_date__gte'] = start
+    if end:
+        lookups['start_date__lte'] = end
+    return lookups
+
+
+# Each export: model, ordering, (header, lookup) columns, and the ?from=/?to= filter
+EXPORTS = {
+    'bills': {
+        'queryset': lambda: bill.objects.all(),
+        'order_by': ('bill_time', 'id'),
+        'columns': [
+            ('id', 'id'), ('bill_time', 'bill_time'), ('name', 'name'), ('phone', 'phone'),
+            ('table_number', 'table_number'), ('bill_total', 'bill_total'), ('order_items', 'order_items'),
+        ],
+        'range': lambda start, end: _day_bounds('bill_time', start, end),
+    },
+    'orders': {
+        'queryset': lambda: order.objects.all(),
+        'order_by': ('created_at', 'id'),
+        'columns': [
+            ('id', 'id'), ('created_at', 'created_at'), ('name', 'name'), ('phone', 'phone'),
+            ('order_type', 'order_type'), ('table', 'table'), ('status', 'status'), ('price', 'price'),
+            ('bill_clear', 'bill_clear'), ('items', 'items_json'),
+        ],
+        'range': lambda start, end: _day_bounds('created_at', start, end),
+    },
+    'attendance': {
+        'queryset': lambda: Attendance.objects.all(),
+        'order_by': ('date', 'staff_id'),
+        'columns': [
+            ('date', 'date'), ('employee_id', 'staff__employee_id'), ('first_name', 'staff__first_name'),
+            ('last_name', 'staff__last_name'), ('department', 'staff__department__name'), ('status', 'status'),
+            ('check_in_time', 'check_in_time'), ('check_out_time', 'check_out_time'), ('notes', 'notes'),
+        ],
+        'range': lambda start, end: _date_range('date', start, end),
+    },
+    'leaves': {
+        'queryset': lambda: Leave.objects.all(),
+        'order_by': ('start_date', 'id'),
+        'columns': [
+            ('id', 'id'), ('employee_id', 'staff__employee_id'), ('first_name', 'staff__first_name'),
+            ('last_name', 'staff__last_name'), ('department', 'staff__department__name'),
+            ('leave_type', 'leave_type'), ('status', 'status'), ('start_date', 'start_date'),
+            ('end_date', 'end_date'), ('reason', 'reason'), ('approved_by', 'approved_by__employee_id'),
+            ('approved_at', 'approved_at'),
+        ],
+        'range': _leave_overlap,
+    },
+}
+
+
+def export_headers(name):
+    return [header for header, _ in EXPORTS[name]['columns']]
+
+
+def export_rows(name, start=None, end=None, chunk_size=EXPORT_CHUNK_SIZE, using=None):
+    """Rows of one export as tuples, read from the database ``chunk_size`` at a time"""
+    spec = EXPORTS[name]
+    queryset = spec['queryset']().using(using).filter(**spec['range'](start, end)).order_by(*spec['order_by'])
+    lookups = [lookup for _, lookup in spec['columns']]
+    return queryset.values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+def _text(value, tz):
+    # tz is resolved once per export; timezone.localtime() looks it up on every call
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.astimezone(tz).isoformat() if value.tzinfo else value.isoformat()
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return value
+
+
+class _Echo:
+    """File-like object whose write() hands the row straight back to the caller"""
+
+    def write(self, value):
+        return value
+
+
+# Spreadsheet apps run cells starting with these as formulas
+CSV_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def csv_safe(value):
+    """Quote text a spreadsheet would run as a formula; every CSV writer passes cells through this"""
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_export_csv(name, start=None, end=None, chunk_size=EXPORT_CHUNK_SIZE, using=None):
+    tz = timezone.get_current_timezone()
+    writer = csv.writer(_Echo())
+    yield writer.writerow(export_headers(name))
+    for row in export_rows(name, start, end, chunk_size, using):
+        yield writer.writerow([csv_safe(_text(value, tz)) for value in row])
+
+
+# Minimal SpreadsheetML package: one worksheet of inline strings, so no shared
+# string table has to be held in memory while rows stream out.
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="xl/workbook.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Target="worksheets/sheet1.xml" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>'
+        '</Relationships>'
+    ),
+}
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+# Control characters are not allowed in XML 1.0 text
+_XML_ILLEGAL_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _xlsx_cell(value, tz):
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = _XML_ILLEGAL_RE.sub('', str(_text(value, tz)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _xlsx_row(values, tz):
+    return ('<row>' + ''.join(_xlsx_cell(value, tz) for value in values) + '</row>').encode()
+
+
+class _ZipSink:
+    """Unseekable write target for zipfile; collects output until the generator drains it"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_export_xlsx(name, start=None, end=None, chunk_size=EXPORT_CHUNK_SIZE, using=None):
+    """Stream an export as an .xlsx workbook without building it in memory.
+
+    zipfile writes to an unseekable sink using data descriptors, so the
+    compressed worksheet can be handed to the client as it is produced.
+    """
+    tz = timezone.get_current_timezone()
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for part, content in _XLSX_PARTS.items():
+            archive.writestr(part, content.replace('{name}', name))
+        yield sink.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write(_SHEET_HEAD.encode())
+            sheet.write(_xlsx_row(export_headers(name), tz))
+            for number, row in enumerate(export_rows(name, start, end, chunk_size, using), start=1):
+                sheet.write(_xlsx_row(row, tz))
+                if number % chunk_size == 0 and sink.chunks:
+                    yield sink.drain()
+            sheet.write(_SHEET_TAIL.encode())
+    yield sink.drain()
+
+
+def iter_export(name, export_type='csv', start=None, end=None, chunk_size=EXPORT_CHUNK_SIZE, using=None):
+    if export_type == 'xlsx':
+        return iter_export_xlsx(name, start, end, chunk_size, using)
+    return iter_export_csv(name, start, end, chunk_size, using)
@@ -0,0 +1,281 @@
+import calendar
+from collections import Counter
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .leave_index import overlapping_leave_ids
+from .models import Attendance, Leave, Staff
+
+
+# One-letter codes used in the attendance matrix day strings
+ATTENDANCE_CODES = {
+    'present': 'P',
+    'late': 'L',
+    'half_day': 'H',
+    'leave': 'V',
+    'absent': 'A',
+}
+NO_RECORD = '-'
+
+# Bulk review decisions and the status each one sets
+LEAVE_DECISIONS = {
+    'approve': 'approved',
+    'reject': 'rejected',
+}
+BULK_REVIEW_LIMIT = 500
+
+# Kiosk clock events; "in" sorts before "out" when both carry the same timestamp
+PUNCH_TYPES = ('in', 'out')
+PUNCH_SYNC_LIMIT = 1000
+
+
+def parse_month(value):
+    """Parse ``YYYY-MM`` into (first day, last day); raises ValueError"""
+    year, month = (int(part) for part in value.split('-'))
+    last_day = calendar.monthrange(year, month)[1]
+    return date(year, month, 1), date(year, month, last_day)
+
+
+def attendance_matrix(month, department_id=None):
+    """Staff x day attendance grid for one month.
+
+    Reads the month with a single range scan on the (date, staff) index and
+    pivots it in memory: each staff row gets a string with one status code per
+    day, and the totals are counted from that string.
+    """
+    first_day, last_day = parse_month(month)
+    days = last_day.day
+
+    staff = Staff.objects.filter(is_active=True).order_by('employee_id')
+    if department_id:
+        staff = staff.filter(department_id=department_id)
+    staff_rows = list(staff.values_list('id', 'employee_id', 'first_name', 'last_name', 'department__name'))
+
+    grid = {row[0]: [NO_RECORD] * days for row in staff_rows}
+    records = Attendance.objects.filter(date__range=(first_day, last_day))
+    if department_id:
+        records = records.filter(staff__department_id=department_id)
+    for staff_id, day, status in records.order_by().values_list('staff_id', 'date', 'status'):
+        cells = grid.get(staff_id)
+        if cells is not None:
+            cells[day.day - 1] = ATTENDANCE_CODES.get(status, NO_RECORD)
+
+    rows = []
+    for staff_id, employee_id, first_name, last_name, department in staff_rows:
+        cells = ''.join(grid[staff_id])
+        rows.append({
+            'id': staff_id,
+            'employee_id': employee_id,
+            'name': f"{first_name} {last_name}",
+            'department': department,
+            'days': cells,
+            'totals': {status: cells.count(code) for status, code in ATTENDANCE_CODES.items()},
+        })
+
+    return {
+        'month': first_day.strftime('%Y-%m'),
+        'days': days,
+        'codes': {code: status for status, code in ATTENDANCE_CODES.items()} | {NO_RECORD: None},
+        'staff': rows,
+    }
+
+
+def leave_calendar(start, end, department_id=None):
+    """Pending and approved leave overlapping [start, end], grouped by department.
+
+    Candidates come from the leave interval index, so only leaves that touch
+    the window are read. Each department also gets the number of staff out per day.
+    """
+    ids = overlapping_leave_ids(start, end)
+    leaves = (
+        Leave.objects.filter(pk__in=ids)
+        .order_by('start_date', 'staff__employee_id')
+        .values_list(
+            'id', 'staff_id', 'staff__employee_id', 'staff__first_name', 'staff__last_name',
+            'staff__department_id', 'staff__department__name', 'leave_type', 'status', 'start_date', 'end_date',
+        )
+    )
+    if department_id:
+        leaves = leaves.filter(staff__department_id=department_id)
+
+    departments = {}
+    for (leave_id, staff_id, employee_id, first_name, last_name, dept_id, dept_name,
+         leave_type, status, leave_start, leave_end) in leaves:
+        department = departments.setdefault(dept_id, {
+            'id': dept_id, 'name': dept_name, 'leaves': [], 'out_by_day': Counter(),
+        })
+        department['leaves'].append({
+            'id': leave_id,
+            'staff_id': staff_id,
+            'employee_id': employee_id,
+            'staff_name': f"{first_name} {last_name}",
+            'leave_type': leave_type,
+            'status': status,
+            'start_date': leave_start,
+            'end_date': leave_end,
+        })
+        day = max(leave_start, start)
+        while day <= min(leave_end, end):
+            department['out_by_day'][day.isoformat()] += 1
+            day += timedelta(days=1)
+
+    for department in departments.values():
+        department['out_by_day'] = dict(sorted(department['out_by_day'].items()))
+    return {
+        'from': start,
+        'to': end,
+        'departments': sorted(departments.values(), key=lambda department: department['name']),
+    }
+
+
+def review_leaves(ids, decision, reviewer=None):
+    """Approve or reject many leaves at once; returns one outcome per requested id.
+
+    Only pending leaves change. They are moved by a single guarded UPDATE, so a
+    leave that another admin decided on in the meantime is reported as skipped
+    with its current status instead of being overwritten.
+    """
+    new_status = LEAVE_DECISIONS[decision]
+    ids = list(dict.fromkeys(ids))
+    with transaction.atomic():
+        current = dict(
+            Leave.objects.select_for_update().filter(pk__in=ids).order_by().values_list('id', 'status')
+        )
+        pending = [leave_id for leave_id, leave_status in current.items() if leave_status == 'pending']
+        # update() skips auto_now, so updated_at is stamped here
+        now = timezone.now()
+        updated = Leave.objects.filter(pk__in=pending, status='pending').update(
+            status=new_status, approved_by=reviewer, approved_at=now, updated_at=now,
+        )
+
+    results = []
+    for leave_id in ids:
+        if leave_id not in current:
+            results.append({'id': leave_id, 'outcome': 'not_found'})
+        elif current[leave_id] == 'pending':
+            results.append({'id': leave_id, 'outcome': new_status})
+        else:
+            results.append({'id': leave_id, 'outcome': 'skipped', 'status': current[leave_id]})
+    return {'decision': decision, 'updated': updated, 'results': results}
+
+
+def parse_punches(raw):
+    """Validate a kiosk batch into (index, employee_id, type, local datetime) tuples; raises ValueError.
+
+    Naive timestamps are taken as local time. Sub-second precision is dropped
+    so a punch retried by the kiosk always compares equal to the original.
+    """
+    if not isinstance(raw, list) or not raw:
+        raise ValueError('punches must be a non-empty list')
+    if len(raw) > PUNCH_SYNC_LIMIT:
+        raise ValueError(f'At most {PUNCH_SYNC_LIMIT} punches can be synced at once')
+
+    punches = []
+    for index, punch in enumerate(raw):
+        if not isinstance(punch, dict):
+            raise ValueError(f'punch {index} must be an object')
+        employee_id = str(punch.get('employee_id') or '').strip()
+        punch_type = punch.get('type')
+        try:
+            timestamp = parse_datetime(str(punch.get('timestamp') or ''))
+        except ValueError:
+            timestamp = None
+        if not employee_id or punch_type not in PUNCH_TYPES or timestamp is None:
+            raise ValueError(f"punch {index} needs employee_id, type ({' or '.join(PUNCH_TYPES)}) and an ISO timestamp")
+        if timezone.is_naive(timestamp):
+            timestamp = timezone.make_aware(timestamp)
+        punches.append((index, employee_id, punch_type, timezone.localtime(timestamp).replace(microsecond=0)))
+    return punches
+
+
+def _resolve_day(record, day_punches, outcomes):
+    """Fold one staff member's punches for one day into ``record``; returns True if it changed.
+
+    The earliest check-in and the latest check-out win, whether they come
+    from the batch or were already stored, so replaying a batch or syncing
+    kiosks in any order converges on the same row.
+    """
+    stored_in, stored_out = record.check_in_time, record.check_out_time
+    ins = sorted((moment.time(), index) for index, punch_type, moment in day_punches if punch_type == 'in')
+    outs = sorted((moment.time(), index) for index, punch_type, moment in day_punches if punch_type == 'out')
+
+    check_in = min([time for time, _ in ins] + ([stored_in] if stored_in else []), default=None)
+    seen = {stored_in}
+    for time, index in ins:
+        outcomes[index] = 'duplicate' if time in seen else 'applied' if time == check_in else 'superseded'
+        seen.add(time)
+
+    valid_outs = []
+    for time, index in outs:
+        if check_in is None:
+            outcomes[index] = 'no_check_in'
+        elif time < check_in:
+            outcomes[index] = 'out_before_in'
+        else:
+            valid_outs.append((time, index))
+    check_out = max([time for time, _ in valid_outs] + ([stored_out] if stored_out else []), default=None)
+    seen = {stored_out}
+    for time, index in reversed(valid_outs):
+        outcomes[index] = 'duplicate' if time in seen else 'applied' if time == check_out else 'superseded'
+        seen.add(time)
+
+    changed = (check_in, check_out) != (stored_in, stored_out)
+    record.check_in_time, record.check_out_time = check_in, check_out
+    if check_in != stored_in and record.status == 'absent':
+        record.status = 'present'
+    return changed
+
+
+def sync_punches(punches):
+    """Upsert a batch of kiosk punches in one transaction.
+
+    Punches are grouped by staff member and local date, folded into that
+    day's attendance row by ``_resolve_day`` and written back with one bulk
+    insert and one bulk update. Returns an outcome per punch in request order.
+    """
+    employee_ids = {employee_id for _, employee_id, _, _ in punches}
+    staff_ids = dict(Staff.objects.filter(employee_id__in=employee_ids).values_list('employee_id', 'id'))
+
+    outcomes = {}
+    days = {}
+    for index, employee_id, punch_type, moment in punches:
+        staff_id = staff_ids.get(employee_id)
+        if staff_id is None:
+            outcomes[index] = 'unknown_staff'
+            continue
+        days.setdefault((staff_id, moment.date()), []).append((index, punch_type, moment))
+
+    created, updated = [], []
+    with transaction.atomic():
+        existing = {
+            (record.staff_id, record.date): record
+            for record in Attendance.objects.select_for_update().filter(
+                staff_id__in={staff_id for staff_id, _ in days}, date__in={day for _, day in days},
+            )
+            if (record.staff_id, record.date) in days
+        }
+        now = timezone.now()
+        for (staff_id, day), day_punches in sorted(days.items()):
+            record = existing.get((staff_id, day))
+            if record is None:
+                record = Attendance(staff_id=staff_id, date=day, status='present')
+                if _resolve_day(record, day_punches, outcomes):
+                    created.append(record)
+            elif _resolve_day(record, day_punches, outcomes):
+                record.updated_at = now
+                updated.append(record)
+
+        Attendance.objects.bulk_create(created)
+        Attendance.objects.bulk_update(updated, ['check_in_time', 'check_out_time', 'status', 'updated_at'])
+
+    return {
+        'created': len(created),
+        'updated': len(updated),
+        'results': [
+            {'index': index, 'employee_id': employee_id, 'type': punch_type, 'outcome': outcomes[index]}
+            for index, employee_id, punch_type, _ in punches
+        ],
+    }
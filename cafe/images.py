@@ -0,0 +1,134 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from PIL import Image, ImageOps
+
+
+logger = logging.getLogger(__name__)
+
+# Variant name -> longest edge in pixels
+VARIANT_SIZES = {
+    'thumb': 160,
+    'card': 480,
+    'full': 1200,
+}
+
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+VARIANT_DIR = 'fimage/variants'
+
+_executor = None
+
+
+def build_variants(image_field):
+    """Resize an uploaded menu image into every size/format and store the files.
+
+    Returns the variant map saved on ``menu_item.image_variants``:
+    ``{'source': <image name>, 'thumb': {'width', 'height', 'webp', 'jpeg'}, ...}``
+    """
+    with image_field.open('rb') as f:
+        source = Image.open(f)
+        source = ImageOps.exif_transpose(source)
+        source = source.convert('RGB')
+        source.load()
+
+    stem = os.path.splitext(os.path.basename(image_field.name))[0]
+    variants = {'source': image_field.name}
+    for size_name, edge in VARIANT_SIZES.items():
+        resized = source.copy()
+        resized.thumbnail((edge, edge), Image.LANCZOS)
+        entry = {'width': resized.width, 'height': resized.height}
+        for ext, (pil_format, options) in VARIANT_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, format=pil_format, **options)
+            name = f"{VARIANT_DIR}/{stem}_{size_name}.{ext}"
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            entry[ext] = default_storage.save(name, ContentFile(buffer.getvalue()))
+        variants[size_name] = entry
+    return variants
+
+
+def _variant_files(variants):
+    return {
+        (variants or {}).get(size_name, {}).get(ext)
+        for size_name in VARIANT_SIZES
+        for ext in VARIANT_FORMATS
+    } - {None}
+
+
+def delete_variant_files(variants, keep=None):
+    for name in _variant_files(variants) - _variant_files(keep):
+        if default_storage.exists(name):
+            default_storage.delete(name)
+
+
+def process_menu_item_image(item_id, force=False):
+    """Build variants for one menu item; returns True if variants were written"""
+    from .caches import bump_menu_version
+    from .models import menu_item
+
+    try:
+        item = menu_item.objects.get(pk=item_id)
+        if not item.image:
+            return False
+        if not force and item.image_variants.get('source') == item.image.name:
+            return False
+
+        variants = build_variants(item.image)
+        # Guard against the image having been replaced while we were resizing
+        updated = menu_item.objects.filter(pk=item.pk, image=item.image.name).update(image_variants=variants)
+        if updated:
+            delete_variant_files(item.image_variants, keep=variants)
+            bump_menu_version()
+        return bool(updated)
+    except menu_item.DoesNotExist:
+        return False
+
+
+def _run_in_worker(item_id):
+    try:
+        process_menu_item_image(item_id)
+    except Exception:
+        logger.exception("Image variant processing failed for menu item %s", item_id)
+    finally:
+        # Worker threads own their connections
+        connection.close()
+
+
+def schedule_variants(item_id):
+    """Queue variant processing on the background worker pool"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'IMAGE_VARIANT_WORKERS', 2),
+            thread_name_prefix='menu-image',
+        )
+    return _executor.submit(_run_in_worker, item_id)
+
+
+def variant_srcset(item, request=None):
+    """Variant URLs for the current image, or None until the worker has produced them"""
+    variants = item.image_variants or {}
+    if not item.image or variants.get('source') != item.image.name:
+        return None
+
+    srcset = {}
+    for size_name in VARIANT_SIZES:
+        entry = variants.get(size_name)
+        if not entry:
+            continue
+        srcset[size_name] = {'width': entry['width'], 'height': entry['height']}
+        for ext in VARIANT_FORMATS:
+            url = default_storage.url(entry[ext])
+            srcset[size_name][ext] = request.build_absolute_uri(url) if request else url
+    return srcset
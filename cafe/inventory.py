@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models import F
+
+from .caches import bump_menu_version
+from .models import menu_item
+
+
+class OutOfStockError(Exception):
+    def __init__(self, item_id, name):
+        super().__init__(f"{name} is sold out")
+        self.item_id = item_id
+
+
+def reserve_stock(lines, catalog):
+    """Decrement stock for tracked items in the caller's transaction.
+
+    Each decrement is a single conditional UPDATE (``stock >= quantity``), so
+    parallel orders can never take an item below zero and nothing is locked
+    beyond the rows being written. Raises OutOfStockError if any line can't be
+    covered; the caller's transaction then rolls back every earlier decrement.
+    Items that reach zero are flipped to unavailable and the menu cache bumped.
+    """
+    tracked = sorted(
+        (line for line in lines if getattr(catalog.get(line.item_id), 'stock_tracked', True)),
+        key=lambda line: line.item_id,
+    )
+    if not tracked:
+        return
+
+    for line in tracked:
+        updated = menu_item.objects.filter(pk=line.item_id, stock__gte=line.quantity).update(
+            stock=F('stock') - line.quantity
+        )
+        if not updated:
+            raise OutOfStockError(line.item_id, line.name)
+
+    sold_out = menu_item.objects.filter(
+        pk__in=[line.item_id for line in tracked], stock__lte=0, is_available=True
+    ).update(is_available=False)
+    if sold_out:
+        transaction.on_commit(bump_menu_version)
@@ -0,0 +1,108 @@
+from django.db import connection
+
+
+LEAVE_INTERVAL_TABLE = 'cafe_leave_interval'
+
+# Leaves that still occupy their dates; rejected/cancelled ones drop out of the index
+OPEN_LEAVE_STATUSES = ('pending', 'approved')
+
+# Dates are stored as whole julian day numbers in an integer R*Tree
+_DAY = "CAST(julianday({}) AS INTEGER)"
+_OPEN = "({})".format(', '.join(f"'{status}'" for status in OPEN_LEAVE_STATUSES))
+
+
+def _row(prefix):
+    start, end = _DAY.format(f'{prefix}.start_date'), _DAY.format(f'{prefix}.end_date')
+    return f"{prefix}.id, min({start}, {end}), max({start}, {end}), {prefix}.staff_id"
+
+
+LEAVE_INTERVAL_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {LEAVE_INTERVAL_TABLE} USING rtree_i32(
+        id, start_day, end_day, +staff_id
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {LEAVE_INTERVAL_TABLE}_ai AFTER INSERT ON cafe_leave
+    WHEN new.status IN {_OPEN} BEGIN
+        INSERT INTO {LEAVE_INTERVAL_TABLE}(id, start_day, end_day, staff_id) SELECT {_row('new')};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {LEAVE_INTERVAL_TABLE}_ad AFTER DELETE ON cafe_leave BEGIN
+        DELETE FROM {LEAVE_INTERVAL_TABLE} WHERE id = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {LEAVE_INTERVAL_TABLE}_au AFTER UPDATE ON cafe_leave BEGIN
+        DELETE FROM {LEAVE_INTERVAL_TABLE} WHERE id = old.id;
+        INSERT INTO {LEAVE_INTERVAL_TABLE}(id, start_day, end_day, staff_id)
+        SELECT {_row('new')} WHERE new.status IN {_OPEN};
+    END
+    """,
+]
+
+
+def interval_index_available(using=None):
+    conn = using or connection
+    return conn.vendor == 'sqlite'
+
+
+def ensure_leave_interval_index(conn=None):
+    """Create the leave R*Tree and its sync triggers if missing, rebuilding the index when they were.
+
+    Like the menu search index, this runs after every migrate because SQLite
+    drops triggers when a migration rebuilds cafe_leave.
+    """
+    conn = conn or connection
+    if not interval_index_available(conn):
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+            [f'{LEAVE_INTERVAL_TABLE}_a_'],
+        )
+        if cursor.fetchone()[0] == 3:
+            return False
+        for statement in LEAVE_INTERVAL_SCHEMA:
+            cursor.execute(statement)
+        cursor.execute(f"DELETE FROM {LEAVE_INTERVAL_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {LEAVE_INTERVAL_TABLE}(id, start_day, end_day, staff_id) "
+            f"SELECT {_row('l')} FROM cafe_leave l WHERE l.status IN {_OPEN}"
+        )
+    return True
+
+
+class LeaveOverlapError(Exception):
+    def __init__(self, leave_ids):
+        super().__init__('Leave overlaps an existing pending or approved leave')
+        self.leave_ids = leave_ids
+
+
+def overlapping_leave_ids(start, end, staff_id=None, exclude_id=None):
+    """Ids of pending/approved leaves that overlap [start, end], optionally for one staff member"""
+    from .models import Leave
+
+    if not interval_index_available():
+        queryset = Leave.objects.filter(status__in=OPEN_LEAVE_STATUSES, start_date__lte=end, end_date__gte=start)
+        if staff_id is not None:
+            queryset = queryset.filter(staff_id=staff_id)
+        if exclude_id is not None:
+            queryset = queryset.exclude(pk=exclude_id)
+        return list(queryset.values_list('id', flat=True))
+
+    sql = (
+        f"SELECT id FROM {LEAVE_INTERVAL_TABLE} "
+        f"WHERE start_day <= {_DAY.format('%s')} AND end_day >= {_DAY.format('%s')}"
+    )
+    params = [end.isoformat(), start.isoformat()]
+    if staff_id is not None:
+        sql += " AND staff_id = %s"
+        params.append(staff_id)
+    if exclude_id is not None:
+        sql += " AND id != %s"
+        params.append(exclude_id)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
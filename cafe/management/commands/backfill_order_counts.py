@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+
+from cafe.authentication import customer_accounts
+from cafe.models import User, order
+
+
+class Command(BaseCommand):
+    help = 'Recompute User.order_count from order history with one grouped query'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--link-by-phone', action='store_true',
+            help='First link unlinked orders to the customer account registered with the same phone number',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without saving them')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['link_by_phone']:
+                # Same rule as placing an order: only customer accounts get orders linked
+                customers = customer_accounts()
+                matching_user = customers.filter(phone=OuterRef('phone')).values('pk')[:1]
+                unlinked = order.objects.filter(user__isnull=True, phone__in=customers.values('phone'))
+                linked = unlinked.update(user=Subquery(matching_user))
+                self.stdout.write(f'🔗 Linked {linked} order(s) by phone number')
+
+            counts = dict(
+                order.objects.filter(user__isnull=False)
+                .values_list('user')
+                .annotate(total=Count('id'))
+                .order_by()
+            )
+
+            changed = []
+            for user in User.objects.only('id', 'order_count'):
+                total = counts.get(user.id, 0)
+                if user.order_count != total:
+                    user.order_count = total
+                    changed.append(user)
+
+            if options['dry_run']:
+                transaction.set_rollback(True)
+            else:
+                User.objects.bulk_update(changed, ['order_count'], batch_size=500)
+
+        verb = 'Would update' if options['dry_run'] else 'Updated'
+        self.stdout.write(self.style.SUCCESS(f'🎉 {verb} order_count for {len(changed)} user(s)'))
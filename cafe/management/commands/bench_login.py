@@ -0,0 +1,76 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+
+class Command(BaseCommand):
+    help = 'Measure password verifications (logins) per second for the configured or given hasher costs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hasher', choices=['pbkdf2', 'scrypt', 'argon2'], help='Defaults to PASSWORD_HASHER')
+        parser.add_argument('--iterations', type=int, help='PBKDF2 iterations')
+        parser.add_argument('--work-factor', type=int, help='scrypt N (power of two)')
+        parser.add_argument('--block-size', type=int, help='scrypt r')
+        parser.add_argument('--time-cost', type=int, help='Argon2 time cost')
+        parser.add_argument('--memory-cost', type=int, help='Argon2 memory cost in KiB')
+        parser.add_argument('--parallelism', type=int, help='scrypt p / Argon2 lanes')
+        parser.add_argument('--seconds', type=float, default=3, help='How long to run each measurement')
+        parser.add_argument('--threads', type=int, default=os.cpu_count() or 1, help='Threads for the all-cores run')
+        parser.add_argument('--burst', type=int, default=50, help='Staff logging in at once, for the latency estimate')
+
+    def handle(self, *args, **options):
+        name = options['hasher'] or settings.PASSWORD_HASHER
+        overrides = {}
+        if name == 'pbkdf2' and options['iterations']:
+            overrides['PASSWORD_PBKDF2_ITERATIONS'] = options['iterations']
+        if name == 'scrypt':
+            for option, setting in (('work_factor', 'WORK_FACTOR'), ('block_size', 'BLOCK_SIZE'), ('parallelism', 'PARALLELISM')):
+                if options[option]:
+                    overrides[f'PASSWORD_SCRYPT_{setting}'] = options[option]
+        if name == 'argon2':
+            for option, setting in (('time_cost', 'TIME_COST'), ('memory_cost', 'MEMORY_COST'), ('parallelism', 'PARALLELISM')):
+                if options[option]:
+                    overrides[f'PASSWORD_ARGON2_{setting}'] = options[option]
+
+        algorithm = {'pbkdf2': 'pbkdf2_sha256', 'scrypt': 'scrypt', 'argon2': 'argon2'}[name]
+        with override_settings(**overrides):
+            try:
+                encoded = make_password('correct horse battery staple', hasher=get_hasher(algorithm))
+            except ValueError as ex:
+                raise CommandError(f'{name} is not usable here: {ex}')
+            summary = get_hasher(algorithm).safe_summary(encoded)
+            params = ', '.join(f'{key}={value}' for key, value in summary.items() if key not in ('salt', 'hash'))
+            self.stdout.write(f'🔐 {params}')
+
+            single = self._measure(encoded, 1, options['seconds'])
+            threads = options['threads']
+            parallel = self._measure(encoded, threads, options['seconds']) if threads > 1 else single
+
+        per_core = single
+        burst_seconds = options['burst'] / parallel
+        self.stdout.write(f'⏱️  {1000 / per_core:.1f} ms per login, {per_core:.1f} logins/sec per core')
+        self.stdout.write(f'🧵 {parallel:.1f} logins/sec across {threads} threads')
+        self.stdout.write(
+            self.style.SUCCESS(f'🎯 {options["burst"]} simultaneous logins clear in ~{burst_seconds:.2f}s')
+        )
+
+    def _measure(self, encoded, threads, seconds):
+        deadline = time.perf_counter() + seconds
+
+        def worker():
+            count = 0
+            while time.perf_counter() < deadline:
+                if not check_password('correct horse battery staple', encoded):
+                    raise CommandError('Password check failed')
+                count += 1
+            return count
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            total = sum(future.result() for future in [pool.submit(worker) for _ in range(threads)])
+        return total / (time.perf_counter() - started)
@@ -0,0 +1,125 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+READ_SQL = 'SELECT id, status, price, "table" FROM cafe_order ORDER BY id DESC LIMIT 20'
+WRITE_SQL = (
+    'INSERT INTO cafe_order (items_json, name, phone, "table", price, bill_clear, estimated_time, '
+    'status, order_type, created_at, updated_at) '
+    "VALUES ('[]', 'Bench', '9800000000', 'T1', 100, 0, 15, 'pending', 'table', "
+    "datetime('now'), datetime('now'))"
+)
+
+# Django's stock sqlite3 settings: rollback journal, synchronous=FULL, deferred
+# transactions and a new connection for every request (CONN_MAX_AGE=0)
+BASELINE = {
+    'init_command': 'PRAGMA journal_mode=delete;PRAGMA synchronous=full',
+    'isolation_level': 'DEFERRED',
+    'timeout': 5.0,
+    'reuse': False,
+}
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent read/write throughput of the stock and production SQLite profiles on a copy of the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5, help='How long to run each profile')
+        parser.add_argument('--readers', type=int, default=4, help='Threads listing recent orders')
+        parser.add_argument('--writers', type=int, default=2, help='Threads placing orders')
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES['default']
+        if database['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('bench_sqlite only applies to the sqlite3 backend')
+        production = {
+            'init_command': database.get('OPTIONS', {}).get('init_command', ''),
+            'isolation_level': database.get('OPTIONS', {}).get('transaction_mode') or 'DEFERRED',
+            'timeout': database.get('OPTIONS', {}).get('timeout', 5.0),
+            'reuse': bool(database.get('CONN_MAX_AGE')),
+        }
+
+        self.stdout.write(
+            f"🏁 {options['readers']} reader(s), {options['writers']} writer(s), {options['seconds']:.0f}s per profile"
+        )
+        with tempfile.TemporaryDirectory() as scratch:
+            results = {}
+            for name, profile in (('stock', BASELINE), ('production', production)):
+                # Every profile starts from an identical copy; the live database is never written
+                path = os.path.join(scratch, f'{name}.sqlite3')
+                with sqlite3.connect(path) as target:
+                    connections['default'].ensure_connection()
+                    connections['default'].connection.backup(target)
+                results[name] = self._run(path, profile, options)
+                reads, writes, locked, p95 = results[name]
+                self.stdout.write(
+                    f'📊 {name:<10} {reads:>9.0f} reads/s {writes:>8.0f} writes/s '
+                    f'p95 write {p95 * 1000:>6.1f} ms, {locked} locked error(s)'
+                )
+
+        stock, tuned = results['stock'], results['production']
+        self.stdout.write(self.style.SUCCESS(
+            f'🎉 production profile: {tuned[0] / max(stock[0], 1):.1f}x reads, {tuned[1] / max(stock[1], 1):.1f}x writes'
+        ))
+
+    def _connect(self, path, profile):
+        conn = sqlite3.connect(path, timeout=profile['timeout'], isolation_level=profile['isolation_level'])
+        for statement in filter(None, (part.strip() for part in profile['init_command'].split(';'))):
+            conn.execute(statement).fetchall()
+        return conn
+
+    def _run(self, path, profile, options):
+        # Journal mode is stored in the file, so set it once before the clock starts
+        self._connect(path, profile).close()
+        deadline = time.perf_counter() + options['seconds']
+        counts = {'reads': 0, 'writes': 0, 'locked': 0}
+        write_latencies = []
+        lock = threading.Lock()
+
+        def worker(write):
+            conn = self._connect(path, profile) if profile['reuse'] else None
+            done, locked, latencies = 0, 0, []
+            while time.perf_counter() < deadline:
+                current = conn or self._connect(path, profile)
+                started = time.perf_counter()
+                try:
+                    if write:
+                        current.execute(WRITE_SQL)
+                        current.commit()
+                    else:
+                        current.execute(READ_SQL).fetchall()
+                    done += 1
+                    if write:
+                        latencies.append(time.perf_counter() - started)
+                except sqlite3.OperationalError:
+                    current.rollback()
+                    locked += 1
+                finally:
+                    if conn is None:
+                        current.close()
+            if conn is not None:
+                conn.close()
+            with lock:
+                counts['writes' if write else 'reads'] += done
+                counts['locked'] += locked
+                write_latencies.extend(latencies)
+
+        threads = [threading.Thread(target=worker, args=(False,)) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=worker, args=(True,)) for _ in range(options['writers'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        write_latencies.sort()
+        p95 = write_latencies[int(len(write_latencies) * 0.95)] if write_latencies else 0
+        return counts['reads'] / elapsed, counts['writes'] / elapsed, counts['locked'], p95
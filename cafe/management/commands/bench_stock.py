@@ -0,0 +1,77 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, transaction
+
+from cafe.inventory import OutOfStockError, reserve_stock
+from cafe.models import menu_item
+from cafe.pricing import PricedLine
+
+
+class Command(BaseCommand):
+    help = 'Race parallel orders against a stock-tracked item and check it never oversells'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stock', type=int, default=50, help='Starting stock of the benchmark item')
+        parser.add_argument('--orders', type=int, default=200, help='Orders placed in total')
+        parser.add_argument('--workers', type=int, default=16, help='Orders placed in parallel')
+        parser.add_argument('--quantity', type=int, default=1, help='Units per order')
+
+    def handle(self, *args, **options):
+        item = menu_item.objects.create(
+            name='Stock benchmark item',
+            category='Benchmark',
+            description='Temporary item created by bench_stock',
+            price=1,
+            list_order=0,
+            stock=options['stock'],
+        )
+        line = PricedLine(item.id, options['quantity'], item.name, item.price, item.price * options['quantity'])
+        catalog = {}
+
+        def place_order(_):
+            try:
+                for _attempt in range(20):
+                    try:
+                        with transaction.atomic():
+                            reserve_stock([line], catalog)
+                        return 'sold'
+                    except OutOfStockError:
+                        return 'rejected'
+                    except OperationalError:
+                        # SQLite "database is locked" under write contention; retry
+                        time.sleep(0.01)
+                return 'failed'
+            finally:
+                connection.close()
+
+        self.stdout.write(
+            f'🏁 {options["orders"]} orders x{options["quantity"]} against stock {options["stock"]} '
+            f'with {options["workers"]} workers...'
+        )
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            results = list(pool.map(place_order, range(options['orders'])))
+        elapsed = time.perf_counter() - started
+
+        item.refresh_from_db()
+        sold = results.count('sold')
+        expected = min(options['orders'], options['stock'] // options['quantity'])
+        self.stdout.write(
+            f'⏱️  {elapsed:.2f}s ({options["orders"] / elapsed:.0f} orders/s): '
+            f'{sold} sold, {results.count("rejected")} rejected, {results.count("failed")} failed'
+        )
+        self.stdout.write(f'📦 Final stock {item.stock}, available={item.is_available}')
+
+        ok = (
+            item.stock >= 0
+            and item.stock == options['stock'] - sold * options['quantity']
+            and (results.count('failed') or sold == expected)
+        )
+        item.delete()
+
+        if ok:
+            self.stdout.write(self.style.SUCCESS('🎉 No oversell'))
+        else:
+            self.stdout.write(self.style.ERROR('❌ Stock accounting is inconsistent'))
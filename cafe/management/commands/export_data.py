@@ -0,0 +1,41 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cafe.exports import EXPORT_CHUNK_SIZE, EXPORT_CONTENT_TYPES, EXPORTS, iter_export
+
+
+class Command(BaseCommand):
+    help = 'Stream bills, orders, attendance or leaves to a CSV or XLSX file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('export', choices=list(EXPORTS))
+        parser.add_argument('output', help='File to write')
+        parser.add_argument('--type', choices=list(EXPORT_CONTENT_TYPES), help='Defaults to the output file extension, else csv')
+        parser.add_argument('--from', dest='start', help='First day to include, YYYY-MM-DD')
+        parser.add_argument('--to', dest='end', help='Last day to include, YYYY-MM-DD')
+        parser.add_argument('--database', default='default', help="Database alias to read from, e.g. 'replica'")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help='Rows fetched per database round trip')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        export_type = options['type'] or ('xlsx' if output.endswith('.xlsx') else 'csv')
+        try:
+            start = date.fromisoformat(options['start']) if options['start'] else None
+            end = date.fromisoformat(options['end']) if options['end'] else None
+        except ValueError:
+            raise CommandError('--from and --to must be YYYY-MM-DD')
+
+        started = time.perf_counter()
+        written = 0
+        with open(output, 'wb') as handle:
+            for chunk in iter_export(options['export'], export_type, start, end, options['chunk_size'], options['database']):
+                data = chunk.encode() if isinstance(chunk, str) else chunk
+                handle.write(data)
+                written += len(data)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"📄 Wrote {options['export']} to {output} ({export_type}, {written / 1024:.1f} KiB in {elapsed:.2f}s)"
+        ))
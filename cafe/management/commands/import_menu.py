@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from cafe.menu_io import read_rows, import_menu, MenuImportError
+
+
+class Command(BaseCommand):
+    help = 'Import menu items from a CSV or JSON file in one transaction'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV (id,name,category,description,price,list_order,is_available) or JSON file')
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without applying them')
+        parser.add_argument('--delete-missing', action='store_true', help='Delete menu items not present in the file')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = 'json' if path.lower().endswith('.json') else 'csv'
+        with open(path, 'rb') as f:
+            content = f.read()
+
+        try:
+            summary = import_menu(
+                read_rows(content, fmt),
+                delete_missing=options['delete_missing'],
+                dry_run=options['dry_run'],
+            )
+        except MenuImportError as ex:
+            for error in ex.errors:
+                self.stdout.write(self.style.ERROR(f"❌ Row {error['row']}: {error['error']}"))
+            raise CommandError(str(ex))
+
+        prefix = '🔍 Dry run: ' if options['dry_run'] else '🎉 '
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{summary['created']} created, {summary['updated']} updated, "
+            f"{summary['unchanged']} unchanged, {summary['deleted']} deleted"
+        ))
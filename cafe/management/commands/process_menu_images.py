@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from cafe.images import process_menu_item_image
+from cafe.models import menu_item
+
+
+class Command(BaseCommand):
+    help = 'Generate resized WebP/JPEG variants for menu item images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Images processed in parallel')
+        parser.add_argument('--force', action='store_true', help='Rebuild variants that are already up to date')
+
+    def handle(self, *args, **options):
+        item_ids = list(
+            menu_item.objects.exclude(image='').exclude(image__isnull=True).values_list('id', flat=True)
+        )
+        self.stdout.write(f'🖼️  Processing {len(item_ids)} menu images with {options["workers"]} workers...')
+
+        def process(item_id):
+            try:
+                return process_menu_item_image(item_id, force=options['force'])
+            finally:
+                connection.close()
+
+        processed = skipped = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {pool.submit(process, item_id): item_id for item_id in item_ids}
+            for future in as_completed(futures):
+                item_id = futures[future]
+                try:
+                    if future.result():
+                        processed += 1
+                        self.stdout.write(f'✅ Menu item {item_id}')
+                    else:
+                        skipped += 1
+                except Exception as ex:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f'❌ Menu item {item_id}: {ex}'))
+
+        self.stdout.write(
+            self.style.SUCCESS(f'🎉 {processed} processed, {skipped} already up to date, {failed} failed')
+        )
@@ -0,0 +1,37 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Delete expired rows from django_session in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds to yield the write lock between batches')
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Delete every stored session, e.g. after switching SESSION_BACKEND to signed_cookies',
+        )
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE.endswith('signed_cookies') and not options['all']:
+            self.stdout.write('ℹ️  Sessions live in signed cookies; nothing is stored server-side to expire')
+
+        queryset = Session.objects.all()
+        if not options['all']:
+            queryset = queryset.filter(expire_date__lt=timezone.now())
+
+        # Short batches keep each DELETE's write lock brief so order writes are not held up
+        deleted = 0
+        while True:
+            keys = list(queryset.values_list('session_key', flat=True)[:options['batch_size']])
+            if not keys:
+                break
+            deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+            time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(f'🧹 Deleted {deleted} session(s)'))
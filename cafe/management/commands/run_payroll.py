@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cafe.payroll import run_payroll
+
+
+class Command(BaseCommand):
+    help = "Compute a month's payroll from attendance and approved leave and store a PayrollRun"
+
+    def add_arguments(self, parser):
+        parser.add_argument('month', help='Month to run, as YYYY-MM')
+        parser.add_argument('--dry-run', action='store_true', help='Compute and report without saving')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            run = run_payroll(options['month'], dry_run=options['dry_run'])
+        except ValueError:
+            raise CommandError('month must be YYYY-MM')
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f'💰 {run.month}: {run.staff_count} staff, gross {run.total_gross}, '
+            f'deductions {run.total_deductions}, net {run.total_net} ({elapsed:.2f}s)'
+        )
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS('🧪 Dry run, nothing saved'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'🎉 Saved payroll run #{run.id}'))
@@ -0,0 +1,176 @@
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Max
+
+from .caches import bump_menu_version
+from .exports import CSV_FORMULA_PREFIXES, _Echo, csv_safe
+from .models import menu_item
+
+
+MENU_IO_FIELDS = ['id', 'name', 'category', 'description', 'price', 'list_order', 'is_available']
+
+_TRUE_VALUES = {'1', 'true', 'yes', 'y', 'on'}
+_FALSE_VALUES = {'0', 'false', 'no', 'n', 'off'}
+
+
+class MenuImportError(Exception):
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} row(s) failed validation")
+        self.errors = errors
+
+
+def read_rows(content, fmt='csv'):
+    """Parse CSV text or a JSON list into row dicts"""
+    if fmt == 'json':
+        rows = json.loads(content) if isinstance(content, (str, bytes)) else content
+        if isinstance(rows, dict):
+            rows = rows.get('items', [])
+        if not isinstance(rows, list):
+            raise MenuImportError([{'row': None, 'error': 'Expected a JSON list of menu items'}])
+        return rows
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    return [
+        {key: _csv_unescape(value) for key, value in row.items()}
+        for row in csv.DictReader(io.StringIO(content))
+    ]
+
+
+def _csv_unescape(value):
+    # Undo csv_safe() so an exported menu imports back unchanged
+    if isinstance(value, str) and value.startswith("'") and value[1:].startswith(CSV_FORMULA_PREFIXES):
+        return value[1:]
+    return value
+
+
+def _clean_row(raw):
+    row = {key.strip().lower(): value for key, value in raw.items() if key}
+    cleaned = {}
+
+    if row.get('id') not in (None, ''):
+        cleaned['id'] = int(row['id'])
+
+    for field, max_length in (('name', 50), ('category', 50), ('description', 250)):
+        if field in row:
+            value = str(row[field] or '').strip()
+            if len(value) > max_length:
+                raise ValueError(f"{field} is longer than {max_length} characters")
+            cleaned[field] = value
+
+    if 'price' in row:
+        try:
+            price = Decimal(str(row['price']).strip() or '0').quantize(Decimal('0.01'))
+        except InvalidOperation:
+            raise ValueError(f"invalid price {row['price']!r}")
+        if price < 0 or price >= Decimal('100000000'):
+            raise ValueError(f"price {price} is out of range")
+        cleaned['price'] = price
+
+    if row.get('list_order') not in (None, ''):
+        cleaned['list_order'] = int(row['list_order'])
+
+    if row.get('is_available') not in (None, ''):
+        value = row['is_available']
+        if isinstance(value, bool):
+            cleaned['is_available'] = value
+        elif str(value).strip().lower() in _TRUE_VALUES:
+            cleaned['is_available'] = True
+        elif str(value).strip().lower() in _FALSE_VALUES:
+            cleaned['is_available'] = False
+        else:
+            raise ValueError(f"invalid is_available {value!r}")
+
+    if 'id' not in cleaned and not cleaned.get('name'):
+        raise ValueError('name is required for new items')
+    return cleaned
+
+
+def import_menu(rows, delete_missing=False, dry_run=False):
+    """Diff rows against the menu and apply the changes with bulk queries in one transaction.
+
+    Rows match existing items by ``id``, or by (name, category) when no id is given.
+    Any invalid row aborts the whole import. Returns created/updated/unchanged/deleted counts.
+    """
+    errors = []
+    cleaned_rows = []
+    for index, raw in enumerate(rows, start=1):
+        try:
+            cleaned_rows.append(_clean_row(raw))
+        except (ValueError, TypeError, AttributeError) as ex:
+            errors.append({'row': index, 'error': str(ex)})
+
+    existing = {item.id: item for item in menu_item.objects.all()}
+    by_name = {(item.name.lower(), item.category.lower()): item for item in existing.values()}
+    next_list_order = (menu_item.objects.aggregate(top=Max('list_order'))['top'] or 0) + 1
+
+    to_create, to_update, seen = [], {}, set()
+    changed_fields = set()
+    for index, row in enumerate(cleaned_rows, start=1):
+        if 'id' in row:
+            item = existing.get(row['id'])
+            if item is None:
+                errors.append({'row': index, 'error': f"menu item {row['id']} does not exist"})
+                continue
+        else:
+            item = by_name.get((row['name'].lower(), row.get('category', '').lower()))
+
+        if item is None:
+            if not row.get('category'):
+                errors.append({'row': index, 'error': 'category is required for new items'})
+                continue
+            row.setdefault('list_order', next_list_order)
+            next_list_order = max(next_list_order, row['list_order']) + 1
+            to_create.append(menu_item(**row))
+            continue
+
+        seen.add(item.id)
+        for field, value in row.items():
+            if field != 'id' and getattr(item, field) != value:
+                setattr(item, field, value)
+                changed_fields.add(field)
+                to_update[item.id] = item
+
+    if errors:
+        raise MenuImportError(sorted(errors, key=lambda error: error['row']))
+
+    to_delete = [pk for pk in existing if pk not in seen] if delete_missing else []
+    summary = {
+        'created': len(to_create),
+        'updated': len(to_update),
+        'unchanged': len(seen) - len(to_update),
+        'deleted': len(to_delete),
+        'dry_run': dry_run,
+    }
+    if dry_run or not (to_create or to_update or to_delete):
+        return summary
+
+    with transaction.atomic():
+        menu_item.objects.bulk_create(to_create, batch_size=500)
+        if to_update:
+            menu_item.objects.bulk_update(list(to_update.values()), sorted(changed_fields), batch_size=500)
+        if to_delete:
+            menu_item.objects.filter(pk__in=to_delete).delete()
+        # Bulk writes skip model signals; invalidate the cached menu once for the whole batch
+        transaction.on_commit(bump_menu_version)
+    return summary
+
+
+def iter_menu_csv(chunk_size=500):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(MENU_IO_FIELDS)
+    for row in menu_item.objects.order_by('category', 'name').values_list(*MENU_IO_FIELDS).iterator(chunk_size=chunk_size):
+        yield writer.writerow([csv_safe(value) for value in row])
+
+
+def iter_menu_json(chunk_size=500):
+    yield '['
+    first = True
+    for row in menu_item.objects.order_by('category', 'name').values(*MENU_IO_FIELDS).iterator(chunk_size=chunk_size):
+        row['price'] = str(row['price'])
+        yield ('' if first else ',') + json.dumps(row)
+        first = False
+    yield ']'
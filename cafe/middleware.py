@@ -1,8 +1,33 @@
+from django.conf import settings
 from django.middleware.csrf import CsrfViewMiddleware
 from django.utils.deprecation import MiddlewareMixin
 
+from .replica import REPLICA_PIN_COOKIE, begin_request, end_request, replica_configured
+
+
 class CsrfExemptMiddleware(MiddlewareMixin):
     def process_request(self, request):
         if request.path.startswith('/api/'):
             setattr(request, '_dont_enforce_csrf_checks', True)
         return None
+
+
+class ReplicaPinMiddleware(MiddlewareMixin):
+    """Read-your-writes for the reporting replica (see cafe/replica.py).
+
+    A response to a request that wrote sets a short-lived cookie with the
+    write time; reporting reads then stay on the primary until the replica
+    has been copied past it.
+    """
+
+    def process_request(self, request):
+        begin_request(request.COOKIES.get(REPLICA_PIN_COOKIE))
+
+    def process_response(self, request, response):
+        wrote_at = end_request()
+        if wrote_at is not None and replica_configured():
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, f'{wrote_at:.3f}',
+                max_age=int(settings.REPLICA_MAX_LAG) + 1, httponly=True, samesite='Lax',
+            )
+        return response
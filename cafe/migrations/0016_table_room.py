@@ -0,0 +1,37 @@
+# Generated manually
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def add_room_column(apps, schema_editor):
+    # Older databases already gained cafe_table.room_id outside of migrations
+    Table = apps.get_model('cafe', 'Table')
+    with schema_editor.connection.cursor() as cursor:
+        columns = [
+            col.name for col in schema_editor.connection.introspection.get_table_description(
+                cursor, Table._meta.db_table
+            )
+        ]
+    if 'room_id' not in columns:
+        schema_editor.add_field(Table, Table._meta.get_field('room'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafe', '0015_add_room_to_table'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddField(
+                    model_name='table',
+                    name='room',
+                    field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tables', to='cafe.room'),
+                ),
+            ],
+        ),
+        migrations.RunPython(add_room_column, migrations.RunPython.noop),
+    ]
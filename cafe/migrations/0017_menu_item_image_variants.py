@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafe', '0016_table_room'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menu_item',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated manually
+
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+
+
+def parse_price(raw):
+    cleaned = (raw or '').strip().replace(',', '').lstrip('₹$').strip()
+    value = Decimal(cleaned or '0')
+    if not value.is_finite() or value < 0:
+        raise InvalidOperation(raw)
+    return value.quantize(Decimal('0.01'))
+
+
+def convert_prices(apps, schema_editor):
+    menu_item = apps.get_model('cafe', 'menu_item')
+    unparsed = []
+    items = list(menu_item.objects.only('id', 'name', 'price'))
+    for item in items:
+        try:
+            item.price_amount = parse_price(item.price)
+        except (InvalidOperation, ValueError):
+            item.price_amount = Decimal('0.00')
+            unparsed.append(item)
+    menu_item.objects.bulk_update(items, ['price_amount'])
+
+    if unparsed:
+        print(f"\n  {len(unparsed)} menu item price(s) could not be parsed and were set to 0.00:")
+        for item in unparsed:
+            print(f"    menu_item {item.id} ({item.name}): {item.price!r}")
+
+
+def restore_prices(apps, schema_editor):
+    menu_item = apps.get_model('cafe', 'menu_item')
+    items = list(menu_item.objects.only('id', 'price_amount'))
+    for item in items:
+        # The old column only holds 4 characters
+        item.price = str(int(item.price_amount))[:4]
+    menu_item.objects.bulk_update(items, ['price'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafe', '0017_menu_item_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menu_item',
+            name='price_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.RunPython(convert_prices, restore_prices),
+        migrations.RemoveField(
+            model_name='menu_item',
+            name='price',
+        ),
+        migrations.RenameField(
+            model_name='menu_item',
+            old_name='price_amount',
+            new_name='price',
+        ),
+    ]
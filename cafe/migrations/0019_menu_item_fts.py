@@ -0,0 +1,28 @@
+# Generated manually
+
+from django.db import migrations
+
+
+def create_menu_search_index(apps, schema_editor):
+    from cafe.search import ensure_menu_search_index
+    ensure_menu_search_index(schema_editor.connection)
+
+
+def drop_menu_search_index(apps, schema_editor):
+    from cafe.search import MENU_FTS_TABLE, fts_available
+    if not fts_available(schema_editor.connection):
+        return
+    for suffix in ('ai', 'ad', 'au'):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {MENU_FTS_TABLE}_{suffix}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {MENU_FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafe', '0018_menu_item_price_decimal'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_menu_search_index, drop_menu_search_index),
+    ]
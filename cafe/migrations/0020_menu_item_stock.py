@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafe', '0019_menu_item_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='menu_item',
+            name='stock',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+    ]
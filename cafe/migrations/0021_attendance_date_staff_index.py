@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 23:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafe', '0020_menu_item_stock'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['date', 'staff'], name='cafe_attend_date_staff_idx'),
+        ),
+    ]
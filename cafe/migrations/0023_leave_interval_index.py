@@ -0,0 +1,28 @@
+# Generated manually
+
+from django.db import migrations
+
+
+def create_leave_interval_index(apps, schema_editor):
+    from cafe.leave_index import ensure_leave_interval_index
+    ensure_leave_interval_index(schema_editor.connection)
+
+
+def drop_leave_interval_index(apps, schema_editor):
+    from cafe.leave_index import LEAVE_INTERVAL_TABLE, interval_index_available
+    if not interval_index_available(schema_editor.connection):
+        return
+    for suffix in ('ai', 'ad', 'au'):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {LEAVE_INTERVAL_TABLE}_{suffix}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {LEAVE_INTERVAL_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafe', '0022_payrollrun'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_leave_interval_index, drop_leave_interval_index),
+    ]
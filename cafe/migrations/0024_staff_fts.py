@@ -0,0 +1,28 @@
+# Generated manually
+
+from django.db import migrations
+
+
+def create_staff_search_index(apps, schema_editor):
+    from cafe.search import ensure_staff_search_index
+    ensure_staff_search_index(schema_editor.connection)
+
+
+def drop_staff_search_index(apps, schema_editor):
+    from cafe.search import STAFF_FTS_TABLE, fts_available
+    if not fts_available(schema_editor.connection):
+        return
+    for suffix in ('ai', 'ad', 'au'):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {STAFF_FTS_TABLE}_{suffix}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {STAFF_FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cafe', '0023_leave_interval_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_staff_search_index, drop_staff_search_index),
+    ]
@@ -181,9 +181,11 @@ class menu_item(models.Model):
     category = models.CharField(max_length=50)
     description = models.CharField(max_length=250)
     image = models.ImageField(upload_to='fimage', blank=True, null=True)
-    price = models.CharField(max_length=4, default='0')
+    image_variants = models.JSONField(default=dict, blank=True)  # Resized copies, see cafe/images.py
+    price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     list_order = models.IntegerField()
     is_available = models.BooleanField(default=True)
+    stock = models.IntegerField(blank=True, null=True)  # None = not tracked; sells out automatically at 0
     
     class Meta:
         ordering = ['category', 'name']
@@ -333,6 +335,10 @@ class Attendance(models.Model):
     class Meta:
         unique_together = ['staff', 'date']
         ordering = ['-date', '-created_at']
+        indexes = [
+            # Month/range reports scan by date across all staff
+            models.Index(fields=['date', 'staff'], name='cafe_attend_date_staff_idx'),
+        ]
 
     def __str__(self):
         return f"{self.staff.full_name} - {self.date} - {self.status}"
@@ -376,3 +382,24 @@ class Leave(models.Model):
     @property
     def duration_days(self):
         return (self.end_date - self.start_date).days + 1
+
+
+class PayrollRun(models.Model):
+    """Snapshot of one month's computed pay for every staff member"""
+    id = models.AutoField(primary_key=True)
+    month = models.CharField(max_length=7)  # YYYY-MM
+    staff_count = models.IntegerField(default=0)
+    total_gross = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_deductions = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_net = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    rules = models.JSONField(default=dict, blank=True)  # Deduction rules in force for this run
+    lines = models.JSONField(default=list, blank=True)  # One dict per staff member
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='payroll_runs')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['month', '-created_at'], name='cafe_payroll_month_idx')]
+
+    def __str__(self):
+        return f"Payroll {self.month} ({self.staff_count} staff)"
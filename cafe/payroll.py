@@ -0,0 +1,136 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+
+from .hr import parse_month
+from .models import Attendance, Leave, PayrollRun, Staff
+
+
+CENTS = Decimal('0.01')
+
+
+def _money(value):
+    return value.quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+def payroll_rules():
+    """Deduction rules from settings, stored on every run so old snapshots stay explainable"""
+    return {
+        'late_deduction_rate': str(Decimal(settings.PAYROLL_LATE_DEDUCTION_RATE)),
+        'half_day_deduction_rate': '0.5',
+        'unpaid_leave_types': sorted(settings.PAYROLL_UNPAID_LEAVE_TYPES),
+    }
+
+
+def _dates(start, end):
+    return {start + timedelta(days=offset) for offset in range((end - start).days + 1)}
+
+
+def _count_from(days, start):
+    return sum(1 for day in days if day >= start)
+
+
+def compute_payroll(month):
+    """Compute one line per payable staff member for ``month`` (YYYY-MM).
+
+    Monthly salary is prorated by calendar day from the hire date. Deductions
+    are taken at the daily rate for absences, half days (half rate), late
+    arrivals (PAYROLL_LATE_DEDUCTION_RATE of a day) and approved leave of an
+    unpaid type. Days on approved leave are never also charged as absences.
+    The whole month is read in three queries regardless of headcount.
+    """
+    first_day, last_day = parse_month(month)
+    days_in_month = last_day.day
+    rules = payroll_rules()
+    late_rate = Decimal(rules['late_deduction_rate'])
+    half_day_rate = Decimal(rules['half_day_deduction_rate'])
+    unpaid_types = set(rules['unpaid_leave_types'])
+
+    staff_rows = list(
+        Staff.objects.filter(is_active=True, hire_date__lte=last_day)
+        .exclude(employment_status='terminated')
+        .order_by('employee_id')
+        .values_list('id', 'employee_id', 'first_name', 'last_name', 'department__name', 'salary', 'hire_date')
+    )
+
+    # Only non-present days affect pay, so present rows are never loaded
+    exceptions = defaultdict(lambda: defaultdict(set))
+    records = (
+        Attendance.objects.filter(date__range=(first_day, last_day), status__in=['absent', 'late', 'half_day'])
+        .order_by()
+        .values_list('staff_id', 'date', 'status')
+    )
+    for staff_id, day, status in records:
+        exceptions[staff_id][status].add(day)
+
+    paid_leave = defaultdict(set)
+    unpaid_leave = defaultdict(set)
+    leaves = (
+        Leave.objects.filter(status='approved', start_date__lte=last_day, end_date__gte=first_day)
+        .order_by()
+        .values_list('staff_id', 'leave_type', 'start_date', 'end_date')
+    )
+    for staff_id, leave_type, start, end in leaves:
+        target = unpaid_leave if leave_type in unpaid_types else paid_leave
+        target[staff_id] |= _dates(max(start, first_day), min(end, last_day))
+
+    lines = []
+    for staff_id, employee_id, first_name, last_name, department, salary, hire_date in staff_rows:
+        employed_from = max(hire_date, first_day)
+        employed_days = (last_day - employed_from).days + 1
+        daily_rate = salary / days_in_month
+
+        on_leave = paid_leave[staff_id] | unpaid_leave[staff_id]
+        unpaid_leave_days = _count_from(unpaid_leave[staff_id], employed_from)
+        paid_leave_days = _count_from(paid_leave[staff_id] - unpaid_leave[staff_id], employed_from)
+        absent_days = _count_from(exceptions[staff_id]['absent'] - on_leave, employed_from)
+        half_days = _count_from(exceptions[staff_id]['half_day'] - on_leave, employed_from)
+        late_days = _count_from(exceptions[staff_id]['late'], employed_from)
+
+        gross = _money(daily_rate * employed_days)
+        deductions = {
+            'absence': _money(daily_rate * absent_days),
+            'half_day': _money(daily_rate * half_day_rate * half_days),
+            'late': _money(daily_rate * late_rate * late_days),
+            'unpaid_leave': _money(daily_rate * unpaid_leave_days),
+        }
+        total_deductions = min(sum(deductions.values()), gross)
+
+        lines.append({
+            'staff_id': staff_id,
+            'employee_id': employee_id,
+            'name': f"{first_name} {last_name}",
+            'department': department,
+            'salary': str(salary),
+            'employed_days': employed_days,
+            'absent_days': absent_days,
+            'half_days': half_days,
+            'late_days': late_days,
+            'paid_leave_days': paid_leave_days,
+            'unpaid_leave_days': unpaid_leave_days,
+            'gross': str(gross),
+            'deductions': {name: str(amount) for name, amount in deductions.items()},
+            'total_deductions': str(total_deductions),
+            'net': str(gross - total_deductions),
+        })
+    return first_day.strftime('%Y-%m'), rules, lines
+
+
+def run_payroll(month, user=None, dry_run=False):
+    """Compute ``month`` and persist it as a PayrollRun (unsaved when ``dry_run``)"""
+    month, rules, lines = compute_payroll(month)
+    run = PayrollRun(
+        month=month,
+        staff_count=len(lines),
+        total_gross=sum((Decimal(line['gross']) for line in lines), Decimal('0')),
+        total_deductions=sum((Decimal(line['total_deductions']) for line in lines), Decimal('0')),
+        total_net=sum((Decimal(line['net']) for line in lines), Decimal('0')),
+        rules=rules,
+        lines=lines,
+        created_by=user if user is not None and user.is_authenticated else None,
+    )
+    if not dry_run:
+        run.save()
+    return run
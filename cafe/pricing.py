@@ -0,0 +1,100 @@
+from collections import namedtuple
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+
+from .caches import get_catalog
+
+
+CENT = Decimal('0.01')
+
+PricedLine = namedtuple('PricedLine', ['item_id', 'quantity', 'name', 'unit_price', 'line_total'])
+PricedOrder = namedtuple('PricedOrder', ['lines', 'subtotal', 'tax', 'service_charge', 'total', 'catalog_version'])
+
+
+class PricingError(Exception):
+    pass
+
+
+class StaleCatalogError(PricingError):
+    def __init__(self, current_version, changed_lines=()):
+        super().__init__('Some items in your cart have changed since the menu was loaded. Please review your cart and try again.')
+        self.current_version = current_version
+        self.changed_lines = list(changed_lines)
+
+
+def _money(value):
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _seen_price(item):
+    try:
+        return _money(Decimal(str(item.get('price'))))
+    except (ArithmeticError, ValueError):
+        return None
+
+
+def _changed_lines(items, catalog):
+    """Lines whose item is gone, sold out or priced differently from what the client saw"""
+    changed = []
+    for item in items:
+        try:
+            item_id = int(item.get('menu_item'))
+        except (TypeError, ValueError):
+            continue
+        entry = catalog.get(item_id)
+        seen_price = _seen_price(item)
+        if entry is not None and entry.is_available and seen_price == _money(entry.price):
+            continue
+        changed.append({
+            'menu_item': item_id,
+            'name': entry.name if entry else None,
+            'price': str(seen_price) if seen_price is not None else None,
+            'current_price': str(entry.price) if entry else None,
+            'is_available': bool(entry and entry.is_available),
+        })
+    return changed
+
+
+def price_order(items, catalog_version=None):
+    """Price order lines against the cached catalog; client prices and totals are ignored.
+
+    ``items`` is the request's list of ``{'menu_item': id, 'quantity': n, 'price': p}``.
+    When the client sends the ``catalog_version`` its menu was loaded from and the
+    menu has moved on since, the order is only rejected if one of its own items
+    was removed, sold out or repriced against the ``price`` the client showed;
+    changes to other items (sell-outs, new images) do not affect it.
+    """
+    version, catalog = get_catalog()
+    if not items:
+        raise PricingError('Order has no items')
+
+    if catalog_version and catalog_version != version:
+        changed = _changed_lines(items, catalog)
+        if changed:
+            raise StaleCatalogError(version, changed)
+
+    quantities = {}
+    for item in items:
+        try:
+            item_id = int(item.get('menu_item'))
+            quantity = int(item.get('quantity', 1))
+        except (TypeError, ValueError):
+            raise PricingError(f"Invalid order line: {item}")
+        if quantity < 1:
+            raise PricingError(f"Invalid quantity for item {item_id}")
+        quantities[item_id] = quantities.get(item_id, 0) + quantity
+
+    lines = []
+    for item_id, quantity in quantities.items():
+        entry = catalog.get(item_id)
+        if entry is None:
+            raise PricingError(f"Menu item {item_id} does not exist")
+        if not entry.is_available:
+            raise PricingError(f"{entry.name} is currently unavailable")
+        lines.append(PricedLine(item_id, quantity, entry.name, entry.price, _money(entry.price * quantity)))
+
+    subtotal = sum((line.line_total for line in lines), Decimal('0.00'))
+    tax = _money(subtotal * Decimal(str(getattr(settings, 'ORDER_TAX_RATE', 0))))
+    service_charge = _money(subtotal * Decimal(str(getattr(settings, 'ORDER_SERVICE_CHARGE_RATE', 0))))
+    return PricedOrder(lines, subtotal, tax, service_charge, subtotal + tax + service_charge, version)
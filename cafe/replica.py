@@ -0,0 +1,115 @@
+import contextvars
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+
+REPLICA_DB_ALIAS = 'replica'
+REPLICA_HEARTBEAT_TABLE = 'cafe_replica_heartbeat'
+REPLICA_PIN_COOKIE = 'replica_pin'
+
+# Set while a reporting action runs (see ReportingReadsMixin); only those reads may use the replica
+_reporting = contextvars.ContextVar('replica_reporting', default=False)
+# The replica must hold data from at least this (epoch) time: the client's last
+# write from the pin cookie, or infinity once the current request has written
+_pinned_since = contextvars.ContextVar('replica_pinned_since', default=0.0)
+
+_heartbeat_lock = threading.Lock()
+_heartbeat = {'synced_at': None, 'checked': float('-inf')}
+
+
+def replica_configured():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def start_reporting_reads():
+    return _reporting.set(True)
+
+
+def stop_reporting_reads(token):
+    _reporting.reset(token)
+
+
+def replica_synced_at():
+    """Epoch time the replica was last copied from, re-read at most every REPLICA_LAG_CHECK_SECONDS"""
+    now = time.monotonic()
+    with _heartbeat_lock:
+        if now - _heartbeat['checked'] < settings.REPLICA_LAG_CHECK_SECONDS:
+            return _heartbeat['synced_at']
+        _heartbeat['checked'] = now
+
+    try:
+        with connections[REPLICA_DB_ALIAS].cursor() as cursor:
+            cursor.execute(f"SELECT synced_at FROM {REPLICA_HEARTBEAT_TABLE} WHERE id = 1")
+            row = cursor.fetchone()
+    except DatabaseError:
+        # Missing or half-written replica: treat it as infinitely stale
+        row = None
+    with _heartbeat_lock:
+        _heartbeat['synced_at'] = row[0] if row else None
+    return _heartbeat['synced_at']
+
+
+def reporting_alias():
+    """The replica when it is within REPLICA_MAX_LAG and has this client's last write, else the primary"""
+    if not replica_configured():
+        return DEFAULT_DB_ALIAS
+    synced_at = replica_synced_at()
+    if synced_at is None:
+        return DEFAULT_DB_ALIAS
+    required = max(time.time() - settings.REPLICA_MAX_LAG, _pinned_since.get())
+    return REPLICA_DB_ALIAS if synced_at >= required else DEFAULT_DB_ALIAS
+
+
+def begin_request(pin_cookie):
+    try:
+        pinned = float(pin_cookie or 0)
+    except ValueError:
+        pinned = 0.0
+    _pinned_since.set(pinned)
+
+
+def end_request():
+    """Epoch time to pin the client to if this request wrote anything, else None"""
+    if _pinned_since.get() != float('inf'):
+        return None
+    _pinned_since.set(0.0)
+    return time.time()
+
+
+class ReportingReplicaRouter:
+    """Send reads made by reporting actions to the replica when it is fresh enough.
+
+    Everything else, and every write, uses the primary. A write also pins the
+    rest of the request to the primary, and ReplicaPinMiddleware carries that
+    pin to the client's following requests until the replica has caught up.
+
+    The pin is set as a side effect of db_for_write, which Django also calls
+    for reads that may lead to a write (get_or_create, update_or_create,
+    select_for_update). Those pin
+    the client too; that only sends a few extra reads to the primary and
+    never serves a stale read, so it is accepted rather than tracked per path.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _reporting.get():
+            return reporting_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        _pinned_since.set(float('inf'))
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is a file copy of the primary and is never migrated on its own
+        if db == REPLICA_DB_ALIAS:
+            return False
+        return None
@@ -0,0 +1,199 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+
+MENU_FTS_TABLE = 'cafe_menu_item_fts'
+
+# bm25 column weights: name, category, description
+MENU_FTS_WEIGHTS = (10.0, 4.0, 1.0)
+
+STAFF_FTS_TABLE = 'cafe_staff_fts'
+
+# bm25 column weights: employee_id, first_name, last_name, phone, email
+STAFF_FTS_WEIGHTS = (10.0, 6.0, 6.0, 8.0, 2.0)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+MENU_FTS_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {MENU_FTS_TABLE} USING fts5(
+        name, category, description,
+        content='cafe_menu_item', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {MENU_FTS_TABLE}_ai AFTER INSERT ON cafe_menu_item BEGIN
+        INSERT INTO {MENU_FTS_TABLE}(rowid, name, category, description)
+        VALUES (new.id, new.name, new.category, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {MENU_FTS_TABLE}_ad AFTER DELETE ON cafe_menu_item BEGIN
+        INSERT INTO {MENU_FTS_TABLE}({MENU_FTS_TABLE}, rowid, name, category, description)
+        VALUES ('delete', old.id, old.name, old.category, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {MENU_FTS_TABLE}_au AFTER UPDATE OF name, category, description ON cafe_menu_item BEGIN
+        INSERT INTO {MENU_FTS_TABLE}({MENU_FTS_TABLE}, rowid, name, category, description)
+        VALUES ('delete', old.id, old.name, old.category, old.description);
+        INSERT INTO {MENU_FTS_TABLE}(rowid, name, category, description)
+        VALUES (new.id, new.name, new.category, new.description);
+    END
+    """,
+]
+
+STAFF_FTS_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {STAFF_FTS_TABLE} USING fts5(
+        employee_id, first_name, last_name, phone, email,
+        content='cafe_staff', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {STAFF_FTS_TABLE}_ai AFTER INSERT ON cafe_staff BEGIN
+        INSERT INTO {STAFF_FTS_TABLE}(rowid, employee_id, first_name, last_name, phone, email)
+        VALUES (new.id, new.employee_id, new.first_name, new.last_name, new.phone, new.email);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {STAFF_FTS_TABLE}_ad AFTER DELETE ON cafe_staff BEGIN
+        INSERT INTO {STAFF_FTS_TABLE}({STAFF_FTS_TABLE}, rowid, employee_id, first_name, last_name, phone, email)
+        VALUES ('delete', old.id, old.employee_id, old.first_name, old.last_name, old.phone, old.email);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {STAFF_FTS_TABLE}_au
+    AFTER UPDATE OF employee_id, first_name, last_name, phone, email ON cafe_staff BEGIN
+        INSERT INTO {STAFF_FTS_TABLE}({STAFF_FTS_TABLE}, rowid, employee_id, first_name, last_name, phone, email)
+        VALUES ('delete', old.id, old.employee_id, old.first_name, old.last_name, old.phone, old.email);
+        INSERT INTO {STAFF_FTS_TABLE}(rowid, employee_id, first_name, last_name, phone, email)
+        VALUES (new.id, new.employee_id, new.first_name, new.last_name, new.phone, new.email);
+    END
+    """,
+]
+
+
+def fts_available(using=None):
+    conn = using or connection
+    return conn.vendor == 'sqlite'
+
+
+def _ensure_fts_index(conn, table, schema):
+    if not fts_available(conn):
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+            [f'{table}_a_'],
+        )
+        intact = cursor.fetchone()[0] == 3
+        if intact:
+            return False
+        for statement in schema:
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+    return True
+
+
+def ensure_menu_search_index(conn=None):
+    """Create the FTS5 index and its sync triggers if missing, rebuilding the index when they were.
+
+    SQLite drops triggers whenever a migration rebuilds cafe_menu_item, so this
+    runs after every migrate as well as from the migration that introduced it.
+    """
+    return _ensure_fts_index(conn or connection, MENU_FTS_TABLE, MENU_FTS_SCHEMA)
+
+
+def ensure_staff_search_index(conn=None):
+    """Same as ``ensure_menu_search_index``, for the staff directory"""
+    return _ensure_fts_index(conn or connection, STAFF_FTS_TABLE, STAFF_FTS_SCHEMA)
+
+
+def build_match_query(q, prefix_all=False):
+    """Turn free text into an FTS5 query: every word must match, the last one (or all) as a prefix"""
+    tokens = _TOKEN_RE.findall(q or '')
+    if not tokens:
+        return None
+    if prefix_all:
+        return ' '.join(f'"{token}"*' for token in tokens)
+    terms = [f'"{token}"' for token in tokens[:-1]]
+    terms.append(f'"{tokens[-1]}"*')
+    return ' '.join(terms)
+
+
+def search_menu_ids(q, limit=20, offset=0):
+    """Ids of available menu items matching ``q``, best match first"""
+    from .models import menu_item
+
+    if fts_available():
+        match = build_match_query(q)
+        if match is None:
+            return []
+        weights = ', '.join(str(w) for w in MENU_FTS_WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT m.id FROM {MENU_FTS_TABLE} f
+                JOIN cafe_menu_item m ON m.id = f.rowid
+                WHERE {MENU_FTS_TABLE} MATCH %s AND m.is_available
+                ORDER BY bm25({MENU_FTS_TABLE}, {weights})
+                LIMIT %s OFFSET %s
+                """,
+                [match, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    # Other databases: plain prefix/substring matching on name first
+    tokens = _TOKEN_RE.findall(q or '')
+    if not tokens:
+        return []
+    queryset = menu_item.objects.filter(is_available=True)
+    for token in tokens:
+        queryset = queryset.filter(
+            Q(name__icontains=token) | Q(category__icontains=token) | Q(description__icontains=token)
+        )
+    return list(queryset.order_by('name').values_list('id', flat=True)[offset:offset + limit])
+
+
+def search_staff_ids(q, limit=20, offset=0, active_only=False):
+    """Ids of staff whose employee id, name, phone or email match ``q``, best match first"""
+    from .models import Staff
+
+    if fts_available():
+        # Names are typed partially ("ram shr"), so every word is a prefix
+        match = build_match_query(q, prefix_all=True)
+        if match is None:
+            return []
+        weights = ', '.join(str(w) for w in STAFF_FTS_WEIGHTS)
+        active = 'AND s.is_active' if active_only else ''
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT s.id FROM {STAFF_FTS_TABLE} f
+                JOIN cafe_staff s ON s.id = f.rowid
+                WHERE {STAFF_FTS_TABLE} MATCH %s {active}
+                ORDER BY bm25({STAFF_FTS_TABLE}, {weights}), s.employee_id
+                LIMIT %s OFFSET %s
+                """,
+                [match, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    # Other databases: prefix matching on each searchable column
+    tokens = _TOKEN_RE.findall(q or '')
+    if not tokens:
+        return []
+    queryset = Staff.objects.all()
+    if active_only:
+        queryset = queryset.filter(is_active=True)
+    for token in tokens:
+        queryset = queryset.filter(
+            Q(employee_id__istartswith=token) | Q(first_name__istartswith=token) | Q(last_name__istartswith=token)
+            | Q(phone__startswith=token) | Q(email__istartswith=token)
+        )
+    return list(queryset.order_by('employee_id').values_list('id', flat=True)[offset:offset + limit])
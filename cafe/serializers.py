@@ -1,29 +1,123 @@
 from rest_framework import serializers
-from .models import User, Table, Floor, Room, menu_item, order, rating, bill, Department, Role, Staff, Attendance, Leave
+from .models import User, Table, Floor, Room, menu_item, order, rating, bill, Department, Role, Staff, Attendance, Leave, PayrollRun
 import json
 
 
-class FloorSerializer(serializers.ModelSerializer):
+SAFE_READ_METHODS = ('GET', 'HEAD')
+
+
+def sparse_fieldset(request):
+    """Return (fields, omit) from ``?fields=a,b`` and ``?omit=c`` on read requests; fields is None when absent"""
+    if request is None or request.method not in SAFE_READ_METHODS:
+        return None, set()
+    params = getattr(request, 'query_params', request.GET)
+    fields = {name.strip() for name in params.get('fields', '').split(',') if name.strip()}
+    omit = {name.strip() for name in params.get('omit', '').split(',') if name.strip()}
+    return fields or None, omit
+
+
+def keep_field(name, fields, omit):
+    return (fields is None or name in fields) and name not in omit
+
+
+class SparseFieldsetMixin:
+    """Trim view responses to ``?fields=`` / ``?omit=``.
+
+    Only serializers built by a view (their context carries ``view``) are
+    trimmed, and only at the top level, so nested and internally cached
+    serializations keep every field. Dropped SerializerMethodFields are never
+    evaluated. ``Meta.field_sources`` lists the model columns a method,
+    property or nested serializer field reads, which lets defer_unrequested()
+    skip the rest.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if 'view' not in self.context or not self._is_top_level():
+            return fields
+        wanted, omit = sparse_fieldset(self.context.get('request'))
+        if wanted is None and not omit:
+            return fields
+        for name in list(fields):
+            if not keep_field(name, wanted, omit):
+                del fields[name]
+        return fields
+
+    def _is_top_level(self):
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+
+def defer_unrequested(queryset, serializer_class, request):
+    """Defer model columns that no requested serializer field reads"""
+    wanted, omit = sparse_fieldset(request)
+    if (wanted is None and not omit) or not issubclass(serializer_class, SparseFieldsetMixin):
+        return queryset
+
+    field_sources = getattr(serializer_class.Meta, 'field_sources', {})
+    model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+    needed = set()
+    for name, field in serializer_class().get_fields().items():
+        if not keep_field(name, wanted, omit):
+            continue
+        if name in field_sources:
+            needed.update(field_sources[name])
+            continue
+        source = (field.source or name).split('.')[0]
+        if isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer)) or source not in model_fields:
+            # Unknown dependencies: a method or nested serializer may read any column,
+            # even back through a reverse relation, so keep them all rather than
+            # risk a query per row
+            return queryset
+        needed.add(source)
+
+    deferred = [
+        field.name for field in queryset.model._meta.concrete_fields
+        if not field.is_relation and not field.primary_key and field.name not in needed
+    ]
+    return queryset.defer(*deferred) if deferred else queryset
+
+
+class FloorSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     table_count = serializers.SerializerMethodField()
+    active_table_count = serializers.SerializerMethodField()
+    room_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Floor
-        fields = ['id', 'name', 'description', 'is_active', 'created_at', 'table_count']
+        fields = ['id', 'name', 'description', 'is_active', 'created_at', 'table_count', 'active_table_count', 'room_count']
+        field_sources = {'table_count': [], 'active_table_count': [], 'room_count': []}
         read_only_fields = ['id', 'created_at']
     
+    # FloorViewSet annotates these counts; instances saved by create/update fall back to a query
     def get_table_count(self, obj):
+        if hasattr(obj, 'table_count'):
+            return obj.table_count
         return obj.tables.count()
 
+    def get_active_table_count(self, obj):
+        if hasattr(obj, 'active_table_count'):
+            return obj.active_table_count
+        return obj.tables.filter(is_active=True).count()
 
-class UserSerializer(serializers.ModelSerializer):
+    def get_room_count(self, obj):
+        if hasattr(obj, 'room_count'):
+            return obj.room_count
+        return obj.rooms.count()
+
+
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     staff_profile = serializers.SerializerMethodField()
     
     class Meta:
         model = User
         fields = ['id', 'first_name', 'last_name', 'phone', 'cafe_manager', 'is_superuser', 'order_count', 'staff_profile']
+        field_sources = {'staff_profile': []}
         read_only_fields = ['id', 'order_count']
     
     def get_staff_profile(self, obj):
+        # Views load staff_profile, department and role up front (select_related or
+        # load_staff_profile); this only reads the cached objects
         try:
             staff = obj.staff_profile
             if staff:
@@ -50,7 +144,7 @@ class UserSerializer(serializers.ModelSerializer):
             return None
 
 
-class TableSerializer(serializers.ModelSerializer):
+class TableSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     qr_code_url = serializers.SerializerMethodField()
     floor_name = serializers.CharField(source='floor.name', read_only=True)
     room_name = serializers.CharField(source='room.room_name', read_only=True)
@@ -64,6 +158,7 @@ class TableSerializer(serializers.ModelSerializer):
             'visual_x', 'visual_y', 'floor', 'floor_name', 'room', 'room_name',
             'shape', 'width', 'height', 'radius', 'has_active_order'
         ]
+        field_sources = {'qr_code_url': ['qr_code'], 'has_active_order': ['qr_unique_id']}
         read_only_fields = ['id', 'qr_code', 'qr_code_url', 'qr_unique_id', 'created_at']
     
     def get_qr_code_url(self, obj):
@@ -82,7 +177,7 @@ class TableSerializer(serializers.ModelSerializer):
         ).exists()
 
 
-class RoomSerializer(serializers.ModelSerializer):
+class RoomSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     qr_code_url = serializers.SerializerMethodField()
     floor_name = serializers.CharField(source='floor.name', read_only=True)
     has_active_order = serializers.SerializerMethodField()
@@ -90,6 +185,7 @@ class RoomSerializer(serializers.ModelSerializer):
     class Meta:
         model = Room
         fields = ['id', 'room_number', 'room_name', 'room_type', 'floor', 'floor_name', 'capacity', 'price_per_night', 'is_active', 'room_status', 'qr_code', 'qr_code_url', 'qr_unique_id', 'description', 'amenities', 'created_at', 'updated_at', 'has_active_order']
+        field_sources = {'qr_code_url': ['qr_code'], 'has_active_order': ['qr_unique_id']}
         read_only_fields = ['id', 'qr_code', 'qr_code_url', 'qr_unique_id', 'created_at', 'updated_at']
     
     def get_qr_code_url(self, obj):
@@ -107,13 +203,15 @@ class RoomSerializer(serializers.ModelSerializer):
         ).exists()
 
 
-class MenuItemSerializer(serializers.ModelSerializer):
+class MenuItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
-    price = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, coerce_to_string=False)
     
     class Meta:
         model = menu_item
-        fields = ['id', 'name', 'category', 'description', 'image', 'image_url', 'price', 'is_available']
+        fields = ['id', 'name', 'category', 'description', 'image', 'image_url', 'image_srcset', 'price', 'is_available', 'stock']
+        field_sources = {'image_url': ['image'], 'image_srcset': ['image', 'image_variants']}
         read_only_fields = ['id']
     
     def get_image_url(self, obj):
@@ -124,14 +222,12 @@ class MenuItemSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
     
-    def get_price(self, obj):
-        try:
-            return float(obj.price)
-        except (ValueError, TypeError):
-            return 0.0
+    def get_image_srcset(self, obj):
+        from .images import variant_srcset
+        return variant_srcset(obj, self.context.get('request'))
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items_json = serializers.CharField(read_only=True)
     price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
     name = serializers.CharField(read_only=True)
@@ -147,7 +243,7 @@ class OrderSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class RatingSerializer(serializers.ModelSerializer):
+class RatingSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user_name = serializers.CharField(source='name')
     created_at = serializers.DateField(source='r_date')
     updated_at = serializers.DateField(source='r_date')
@@ -158,7 +254,7 @@ class RatingSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
-class BillSerializer(serializers.ModelSerializer):
+class BillSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     order_items = serializers.JSONField()
     
     class Meta:
@@ -167,7 +263,7 @@ class BillSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'bill_time']
 
 
-class OrderCreateSerializer(serializers.ModelSerializer):
+class OrderCreateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items_json = serializers.JSONField()
     
     class Meta:
@@ -183,18 +279,22 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class DepartmentSerializer(serializers.ModelSerializer):
+class DepartmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     staff_count = serializers.SerializerMethodField()
 
     class Meta:
         model = Department
         fields = ['id', 'name', 'description', 'is_active', 'created_at', 'updated_at', 'staff_count']
+        field_sources = {'staff_count': []}
         read_only_fields = ['id', 'created_at', 'updated_at']
 
     def get_staff_count(self, obj):
+        # DepartmentViewSet annotates the count; instances saved by create/update fall back to a query
+        if hasattr(obj, 'staff_count'):
+            return obj.staff_count
         return obj.staff.count()
 
-class RoleSerializer(serializers.ModelSerializer):
+class RoleSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     department_name = serializers.CharField(source='department.name', read_only=True)
 
     class Meta:
@@ -202,7 +302,7 @@ class RoleSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'description', 'department', 'department_name', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
 
-class StaffSerializer(serializers.ModelSerializer):
+class StaffSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     department_name = serializers.CharField(source='department.name', read_only=True)
     role_name = serializers.CharField(source='role.name', read_only=True)
@@ -218,6 +318,7 @@ class StaffSerializer(serializers.ModelSerializer):
             'employment_status', 'is_active', 'profile_picture', 'profile_picture_url',
             'created_at', 'updated_at'
         ]
+        field_sources = {'profile_picture_url': ['profile_picture'], 'full_name': ['first_name', 'last_name']}
         read_only_fields = ['id', 'created_at', 'updated_at']
 
     def get_profile_picture_url(self, obj):
@@ -225,7 +326,7 @@ class StaffSerializer(serializers.ModelSerializer):
             return self.context['request'].build_absolute_uri(obj.profile_picture.url)
         return None
 
-class StaffCreateSerializer(serializers.ModelSerializer):
+class StaffCreateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user_data = serializers.DictField(write_only=True)
 
     class Meta:
@@ -249,7 +350,7 @@ class StaffCreateSerializer(serializers.ModelSerializer):
         staff = Staff.objects.create(user=user, **validated_data)
         return staff
 
-class AttendanceSerializer(serializers.ModelSerializer):
+class AttendanceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     staff_name = serializers.CharField(source='staff.full_name', read_only=True)
     staff_employee_id = serializers.CharField(source='staff.employee_id', read_only=True)
 
@@ -261,7 +362,7 @@ class AttendanceSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
-class LeaveSerializer(serializers.ModelSerializer):
+class LeaveSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     staff_name = serializers.CharField(source='staff.full_name', read_only=True)
     staff_employee_id = serializers.CharField(source='staff.employee_id', read_only=True)
     approved_by_name = serializers.CharField(source='approved_by.full_name', read_only=True)
@@ -274,4 +375,22 @@ class LeaveSerializer(serializers.ModelSerializer):
             'end_date', 'reason', 'status', 'approved_by', 'approved_by_name', 'approved_at',
             'notes', 'duration_days', 'created_at', 'updated_at'
         ]
+        field_sources = {'duration_days': ['start_date', 'end_date']}
         read_only_fields = ['id', 'created_at', 'updated_at']
+
+    def validate(self, attrs):
+        start_date = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = attrs.get('end_date', getattr(self.instance, 'end_date', None))
+        if start_date and end_date and end_date < start_date:
+            raise serializers.ValidationError({'end_date': 'End date cannot be before the start date'})
+        return attrs
+
+
+class PayrollRunSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    class Meta:
+        model = PayrollRun
+        fields = [
+            'id', 'month', 'staff_count', 'total_gross', 'total_deductions', 'total_net',
+            'rules', 'lines', 'created_by', 'created_at'
+        ]
+        read_only_fields = fields
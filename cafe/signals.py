@@ -0,0 +1,48 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, post_migrate
+from django.dispatch import receiver
+
+from .caches import qr_cache, bump_menu_version
+from .images import schedule_variants
+from .models import Table, Room, menu_item
+
+
+@receiver([post_save, post_delete], sender=Table)
+def invalidate_table_qr(sender, instance, **kwargs):
+    qr_cache.invalidate('table', instance.pk, instance.qr_unique_id)
+
+
+@receiver([post_save, post_delete], sender=Room)
+def invalidate_room_qr(sender, instance, **kwargs):
+    qr_cache.invalidate('room', instance.pk, instance.qr_unique_id)
+
+
+@receiver([post_save, post_delete], sender=menu_item)
+def invalidate_menu(sender, instance, **kwargs):
+    # Bump after commit so no reader caches pre-commit rows under the new version
+    transaction.on_commit(bump_menu_version)
+
+
+@receiver(post_save, sender=menu_item)
+def queue_image_variants(sender, instance, **kwargs):
+    if instance.image and instance.image_variants.get('source') != instance.image.name:
+        item_id = instance.pk
+        transaction.on_commit(lambda: schedule_variants(item_id))
+
+
+@receiver(post_migrate)
+def restore_menu_search_index(sender, using, **kwargs):
+    # Table rebuilds during migrate drop the FTS sync triggers
+    from django.db import connections
+    from .search import ensure_menu_search_index, ensure_staff_search_index
+    if sender.name == 'cafe':
+        ensure_menu_search_index(connections[using])
+        ensure_staff_search_index(connections[using])
+
+
+@receiver(post_migrate)
+def restore_leave_interval_index(sender, using, **kwargs):
+    from django.db import connections
+    from .leave_index import ensure_leave_interval_index
+    if sender.name == 'cafe':
+        ensure_leave_interval_index(connections[using])
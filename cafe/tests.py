@@ -1,3 +1,374 @@
-from django.test import TestCase
+from datetime import date, time
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from cafe.caches import get_menu_version, qr_cache, resolve_qr
+from cafe.leave_index import overlapping_leave_ids
+from cafe.models import (
+    User, Department, Role, Staff, Floor, Table, Room, Leave, Attendance, PayrollRun, menu_item, order,
+)
+from cafe.replica import REPLICA_DB_ALIAS, ReportingReplicaRouter, start_reporting_reads, stop_reporting_reads
+
+
+def create_staff(department, role, number):
+    user = User.objects.create_user(phone=f'98000000{number:02d}', password=None)
+    return Staff.objects.create(
+        user=user,
+        employee_id=f'EMP{number:03d}',
+        first_name='Staff',
+        last_name=str(number),
+        email=f'staff{number}@example.com',
+        phone=user.phone,
+        date_of_birth=date(1990, 1, 1),
+        gender='other',
+        address='Kathmandu',
+        emergency_contact_name='Contact',
+        emergency_contact_phone='9800000000',
+        department=department,
+        role=role,
+        hire_date=date(2024, 1, 1),
+        salary=30000,
+    )
+
+
+class StaffQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.kitchen = Department.objects.create(name='Kitchen')
+        cls.front = Department.objects.create(name='Front Desk')
+        cls.cook = Role.objects.create(name='Cook', department=cls.kitchen)
+        cls.receptionist = Role.objects.create(name='Receptionist', department=cls.front)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_staff_list_query_count_is_constant(self):
+        create_staff(self.kitchen, self.cook, 1)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/staff/')
+        self.assertEqual(len(response.data), 1)
+
+        for number in range(2, 12):
+            create_staff(self.front if number % 2 else self.kitchen, self.receptionist if number % 2 else self.cook, number)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/staff/')
+        self.assertEqual(len(response.data), 11)
+        self.assertEqual(response.data[1]['user']['staff_profile']['role']['name'], 'Cook')
+
+    def test_sparse_fieldset_with_nested_user_keeps_one_query(self):
+        for number in range(1, 6):
+            create_staff(self.kitchen, self.cook, number)
+        # The nested user reads the staff profile back, so no staff column may be deferred
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/staff/?fields=user')
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(set(response.data[0]), {'user'})
+        self.assertEqual(response.data[0]['user']['staff_profile']['employee_id'], 'EMP001')
+
+    def test_current_user_loads_staff_profile_in_one_query(self):
+        staff = create_staff(self.kitchen, self.cook, 1)
+        self.client.force_authenticate(staff.user)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/auth/current_user/')
+        self.assertEqual(response.data['staff_profile']['department']['name'], 'Kitchen')
+
+
+class CountAnnotationQueryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_floor_counts_come_from_one_query(self):
+        # bulk_create skips Table/Room.save(), which would render QR code images
+        for floor_number in range(3):
+            floor = Floor.objects.create(name=f'Floor {floor_number}')
+            Table.objects.bulk_create([
+                Table(table_number=f'{floor_number}-{number}', floor=floor, is_active=number != 0)
+                for number in range(4)
+            ])
+            Room.objects.bulk_create([Room(room_number=f'{floor_number}01', floor=floor)])
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/floors/')
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(
+            {(row['table_count'], row['active_table_count'], row['room_count']) for row in response.data},
+            {(4, 3, 1)},
+        )
+
+    def test_department_staff_counts_come_from_one_query(self):
+        kitchen = Department.objects.create(name='Kitchen')
+        Department.objects.create(name='Front Desk')
+        cook = Role.objects.create(name='Cook', department=kitchen)
+        for number in range(5):
+            create_staff(kitchen, cook, number)
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/departments/')
+        counts = {row['name']: row['staff_count'] for row in response.data}
+        self.assertEqual(counts, {'Kitchen': 5, 'Front Desk': 0})
+
+
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        qr_cache.clear()
+        # Pretend the replica is fresh; the test database has no replica alias, so any
+        # read routed there fails instead of silently hitting the primary
+        patcher = mock.patch('cafe.replica.reporting_alias', return_value=REPLICA_DB_ALIAS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def start_reporting(self):
+        token = start_reporting_reads()
+        self.addCleanup(stop_reporting_reads, token)
+
+    def test_reporting_reads_go_to_the_replica(self):
+        self.start_reporting()
+        self.assertEqual(ReportingReplicaRouter().db_for_read(Table), REPLICA_DB_ALIAS)
+
+    def test_qr_cache_is_filled_from_the_primary(self):
+        # A replica that has not caught up with a new table must not get it cached as missing
+        floor = Floor.objects.create(name='Ground')
+        table = Table.objects.bulk_create([Table(table_number='T1', floor=floor)])[0]
+        self.start_reporting()
+
+        target = resolve_qr(table.qr_unique_id, kind='table')
+        self.assertEqual((target.pk, target.number), (table.pk, 'T1'))
+        self.assertEqual(qr_cache.get(str(table.qr_unique_id)), target)
+
+
+class LeaveOverlapTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        kitchen = Department.objects.create(name='Kitchen')
+        cook = Role.objects.create(name='Cook', department=kitchen)
+        cls.staff = create_staff(kitchen, cook, 1)
+        cls.other = create_staff(kitchen, cook, 2)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def add_leave(self, staff, start_day, end_day, status='pending'):
+        return Leave.objects.create(
+            staff=staff, leave_type='annual', reason='Holiday', status=status,
+            start_date=date(2025, 3, start_day), end_date=date(2025, 3, end_day),
+        )
+
+    def overlapping(self, start_day, end_day, **kwargs):
+        return set(overlapping_leave_ids(date(2025, 3, start_day), date(2025, 3, end_day), **kwargs))
+
+    def test_interval_index_finds_open_leaves_that_touch_the_range(self):
+        pending = self.add_leave(self.staff, 1, 5)
+        self.add_leave(self.staff, 3, 4, status='rejected')
+        approved = self.add_leave(self.other, 5, 6)
+
+        self.assertEqual(self.overlapping(5, 5), {pending.pk, approved.pk})
+        self.assertEqual(self.overlapping(6, 10), {approved.pk})
+        self.assertEqual(self.overlapping(7, 10), set())
+        self.assertEqual(self.overlapping(1, 31, staff_id=self.staff.pk), {pending.pk})
+        self.assertEqual(self.overlapping(1, 31, staff_id=self.staff.pk, exclude_id=pending.pk), set())
+
+        # The index follows status and date changes made through the ORM
+        Leave.objects.filter(pk=pending.pk).update(status='cancelled')
+        approved.end_date = date(2025, 3, 20)
+        approved.save()
+        self.assertEqual(self.overlapping(1, 4), set())
+        self.assertEqual(self.overlapping(15, 15), {approved.pk})
+
+    def test_overlapping_request_is_rejected_with_integer_ids(self):
+        existing = self.add_leave(self.staff, 10, 12, status='approved')
+        self.client.force_authenticate(self.staff.user)
+
+        def request_leave(start_day, end_day):
+            return self.client.post('/api/leaves/', {
+                'staff': self.staff.pk, 'leave_type': 'sick', 'reason': 'Flu',
+                'start_date': f'2025-03-{start_day:02d}', 'end_date': f'2025-03-{end_day:02d}',
+            }, format='json')
+
+        response = request_leave(12, 14)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['conflicting_leaves'], [existing.pk])
+
+        response = request_leave(13, 14)
+        self.assertEqual(response.status_code, 201)
+
+
+class OrderPricingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tea = menu_item.objects.create(name='Tea', category='Drinks', description='', price=Decimal('10.00'), list_order=1)
+            self.cake = menu_item.objects.create(name='Cake', category='Dessert', description='', price=Decimal('25.00'), list_order=2)
+        self.table = Table.objects.bulk_create([Table(table_number='T1', floor=Floor.objects.create(name='Ground'))])[0]
+
+    def place_order(self, items, catalog_version=None):
+        return self.client.post('/api/orders/', {
+            'items': items,
+            'table_unique_id': str(self.table.qr_unique_id),
+            'total_amount': '1.00',
+            'catalog_version': catalog_version,
+        }, format='json')
+
+    def update_item(self, item, **changes):
+        with self.captureOnCommitCallbacks(execute=True):
+            for name, value in changes.items():
+                setattr(item, name, value)
+            item.save()
+
+    def test_prices_come_from_the_catalog_not_the_client(self):
+        response = self.place_order([
+            {'menu_item': self.tea.pk, 'quantity': 2, 'price': '0.01'},
+            {'menu_item': self.tea.pk, 'quantity': 1, 'price': '0.01'},
+            {'menu_item': self.cake.pk, 'quantity': 1, 'price': '0.01'},
+        ])
+        self.assertEqual(response.status_code, 201)
+        placed = order.objects.get()
+        self.assertEqual(placed.price, Decimal('55.00'))
+        self.assertEqual(placed.table, 'T1')
+
+    def test_unavailable_and_unknown_items_are_rejected(self):
+        self.update_item(self.cake, is_available=False)
+        response = self.place_order([{'menu_item': self.cake.pk, 'quantity': 1}])
+        self.assertEqual(response.status_code, 400)
+        response = self.place_order([{'menu_item': 9999, 'quantity': 1}])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(order.objects.exists())
+
+    def test_stale_catalog_only_rejects_orders_whose_lines_changed(self):
+        loaded_version = get_menu_version()
+        tea_as_seen = {'menu_item': self.tea.pk, 'quantity': 1, 'price': '10.00'}
+
+        # Another item selling out moves the version but leaves this order untouched
+        self.update_item(self.cake, is_available=False)
+        self.assertNotEqual(get_menu_version(), loaded_version)
+        self.assertEqual(self.place_order([tea_as_seen], loaded_version).status_code, 201)
+
+        self.update_item(self.tea, price=Decimal('12.00'))
+        response = self.place_order([tea_as_seen], loaded_version)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['catalog_version'], get_menu_version())
+        self.assertEqual(response.data['changed_lines'], [{
+            'menu_item': self.tea.pk, 'name': 'Tea', 'price': '10.00', 'current_price': '12.00', 'is_available': True,
+        }])
+
+        response = self.place_order([{**tea_as_seen, 'price': '12.00'}], response.data['catalog_version'])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(order.objects.count(), 2)
+
+
+class AttendanceSyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        kitchen = Department.objects.create(name='Kitchen')
+        cook = Role.objects.create(name='Cook', department=kitchen)
+        cls.first = create_staff(kitchen, cook, 1)
+        cls.second = create_staff(kitchen, cook, 2)
+        cls.manager = User.objects.create_user(phone='9811111111', password=None, cafe_manager=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.manager)
+
+    def sync(self, *punches):
+        response = self.client.post('/api/attendance/sync/', {'punches': [
+            {'employee_id': employee_id, 'type': punch_type, 'timestamp': f'2025-03-03T{clock}:00'}
+            for employee_id, punch_type, clock in punches
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def times(self, staff):
+        record = Attendance.objects.get(staff=staff, date=date(2025, 3, 3))
+        return record.check_in_time, record.check_out_time
+
+    def test_replaying_a_batch_changes_nothing(self):
+        batch = [('EMP001', 'in', '09:00'), ('EMP001', 'out', '17:00')]
+        first = self.sync(*batch)
+        self.assertEqual((first['created'], first['updated']), (1, 0))
+        self.assertEqual([result['outcome'] for result in first['results']], ['applied', 'applied'])
+
+        replay = self.sync(*batch)
+        self.assertEqual((replay['created'], replay['updated']), (0, 0))
+        self.assertEqual([result['outcome'] for result in replay['results']], ['duplicate', 'duplicate'])
+        self.assertEqual(self.times(self.first), (time(9, 0), time(17, 0)))
+
+    def test_kiosks_syncing_in_any_order_converge(self):
+        kiosk_a = [('in', '09:00'), ('out', '17:00')]
+        kiosk_b = [('in', '08:55'), ('out', '12:00'), ('out', '17:30')]
+        for employee_id, batches in (('EMP001', (kiosk_a, kiosk_b)), ('EMP002', (kiosk_b, kiosk_a))):
+            for batch in batches:
+                self.sync(*[(employee_id, punch_type, clock) for punch_type, clock in batch])
+
+        self.assertEqual(self.times(self.first), (time(8, 55), time(17, 30)))
+        self.assertEqual(self.times(self.second), self.times(self.first))
+
+    def test_punches_that_cannot_apply_are_reported(self):
+        result = self.sync(
+            ('EMP001', 'out', '08:00'), ('EMP001', 'in', '09:00'), ('EMP002', 'out', '17:00'), ('EMP999', 'in', '09:00'),
+        )
+        self.assertEqual(
+            [row['outcome'] for row in result['results']],
+            ['out_before_in', 'applied', 'no_check_in', 'unknown_staff'],
+        )
+        # A day with nothing applicable gets no attendance row
+        self.assertFalse(Attendance.objects.filter(staff=self.second).exists())
+
+
+@override_settings(PAYROLL_LATE_DEDUCTION_RATE='0.1', PAYROLL_UNPAID_LEAVE_TYPES=['other'])
+class PayrollRunTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        kitchen = Department.objects.create(name='Kitchen')
+        cook = Role.objects.create(name='Cook', department=kitchen)
+        cls.staff = create_staff(kitchen, cook, 1)
+        cls.new_hire = create_staff(kitchen, cook, 2)
+        Staff.objects.filter(pk=cls.new_hire.pk).update(hire_date=date(2025, 3, 16))
+        cls.manager = User.objects.create_user(phone='9811111111', password=None, cafe_manager=True)
+
+        for day, status in ((3, 'absent'), (4, 'half_day'), (5, 'late'), (10, 'absent')):
+            Attendance.objects.create(staff=cls.staff, date=date(2025, 3, day), status=status)
+        # The absence on the 10th falls inside paid leave and must not be charged twice
+        for leave_type, start_day, end_day in (('annual', 10, 11), ('other', 20, 20)):
+            Leave.objects.create(
+                staff=cls.staff, leave_type=leave_type, reason='Leave', status='approved',
+                start_date=date(2025, 3, start_day), end_date=date(2025, 3, end_day),
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.manager)
+
+    def run_payroll(self, **extra):
+        return self.client.post('/api/payroll/', {'month': '2025-03', **extra}, format='json')
+
+    def test_deductions_follow_attendance_and_leave(self):
+        response = self.run_payroll()
+        self.assertEqual(response.status_code, 201)
+        lines = {line['employee_id']: line for line in response.data['lines']}
+
+        staff = lines['EMP001']
+        self.assertEqual(
+            (staff['absent_days'], staff['half_days'], staff['late_days'], staff['paid_leave_days'], staff['unpaid_leave_days']),
+            (1, 1, 1, 2, 1),
+        )
+        # 30000 over 31 days is 967.74 a day
+        self.assertEqual(staff['deductions'], {
+            'absence': '967.74', 'half_day': '483.87', 'late': '96.77', 'unpaid_leave': '967.74',
+        })
+        self.assertEqual((staff['gross'], staff['total_deductions'], staff['net']), ('30000.00', '2516.12', '27483.88'))
+
+        # Hired mid-month: paid from the hire date only
+        new_hire = lines['EMP002']
+        self.assertEqual((new_hire['employed_days'], new_hire['gross'], new_hire['net']), (16, '15483.87', '15483.87'))
+        self.assertEqual(response.data['total_net'], '42967.75')
+
+    def test_dry_run_is_not_saved(self):
+        response = self.run_payroll(dry_run=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['staff_count'], 2)
+        self.assertFalse(PayrollRun.objects.exists())
+
+        self.assertEqual(self.run_payroll().status_code, 201)
+        self.assertEqual(PayrollRun.objects.get().month, '2025-03')
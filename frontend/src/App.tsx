@@ -16,6 +16,7 @@ import MenuManagement from './components/MenuManagement';
 import RoomManagement from './components/RoomManagement';
 import StaffPortal from './components/StaffPortal';
 import AdminHR from './components/AdminHR';
+import AttendanceKiosk from './components/AttendanceKiosk';
 import OrderManagement from './components/OrderManagement';
 import MyOrders from './components/MyOrders';
 import Reviews from './components/Reviews';
@@ -209,6 +210,14 @@ const AppContent: React.FC = () => {
           </MainLayout>
         }
       />
+      <Route
+        path="/attendance-kiosk"
+        element={
+          <MainLayout>
+            <AttendanceKiosk />
+          </MainLayout>
+        }
+      />
       <Route
         path="/admin-hr"
         element={
@@ -18,6 +18,8 @@ import {
   IconButton,
   Avatar,
   TextField,
+  Button,
+  Checkbox,
 } from '@mui/material';
 import {
   CheckCircle as CheckCircleIcon,
@@ -25,7 +27,7 @@ import {
   Person as PersonIcon,
 } from '@mui/icons-material';
 import { apiService } from '../services/api';
-import { Staff, Attendance, Leave } from '../types';
+import { Staff, Attendance, Leave, AttendanceMatrix } from '../types';
 
 interface TabPanelProps {
   children?: React.ReactNode;
@@ -57,12 +59,33 @@ const AdminHR: React.FC = () => {
   const [success, setSuccess] = useState('');
   const [tabValue, setTabValue] = useState(0);
   const [selectedDate, setSelectedDate] = useState(new Date().toISOString().split('T')[0]);
+  const [matrixMonth, setMatrixMonth] = useState(new Date().toISOString().slice(0, 7));
+  const [matrix, setMatrix] = useState<AttendanceMatrix | null>(null);
+  const [selectedLeaves, setSelectedLeaves] = useState<number[]>([]);
 
 
   useEffect(() => {
     loadData();
   }, []);
 
+  useEffect(() => {
+    if (tabValue === 3 && matrixMonth) {
+      loadMatrix(matrixMonth);
+    }
+  }, [tabValue, matrixMonth]);
+
+  // Monthly sheets come pre-pivoted from the server: one compact row per staff member
+  const loadMatrix = async (month: string) => {
+    try {
+      setLoading(true);
+      setMatrix(await apiService.getAttendanceMatrix(month));
+    } catch (error: any) {
+      setError(error.response?.data?.error || 'Failed to load the monthly attendance sheet');
+    } finally {
+      setLoading(false);
+    }
+  };
+
   const loadData = async () => {
     try {
       setLoading(true);
@@ -107,6 +130,37 @@ const AdminHR: React.FC = () => {
     }
   };
 
+  const pendingLeaveIds = leaves.filter((leave) => leave.status === 'pending').map((leave) => leave.id);
+
+  const toggleLeave = (leaveId: number) => {
+    setSelectedLeaves((selected) =>
+      selected.includes(leaveId) ? selected.filter((id) => id !== leaveId) : [...selected, leaveId]
+    );
+  };
+
+  const toggleAllLeaves = () => {
+    setSelectedLeaves((selected) => (selected.length === pendingLeaveIds.length ? [] : pendingLeaveIds));
+  };
+
+  // One round trip for the whole month-end batch instead of one request per leave
+  const handleBulkReview = async (decision: 'approve' | 'reject') => {
+    try {
+      setLoading(true);
+      const result = await apiService.reviewLeaves(selectedLeaves, decision);
+      const skipped = result.results.filter((row) => row.outcome === 'skipped' || row.outcome === 'not_found').length;
+      setSuccess(
+        `${result.updated} leave(s) ${decision === 'approve' ? 'approved' : 'rejected'}` +
+        (skipped ? `, ${skipped} already reviewed or missing` : '')
+      );
+      setSelectedLeaves([]);
+      loadData();
+    } catch (error: any) {
+      setError(error.response?.data?.error || 'Failed to review leaves');
+    } finally {
+      setLoading(false);
+    }
+  };
+
   const getAttendanceStatus = (record: Attendance) => {
     if (record.check_in_time && record.check_out_time) {
       return 'Completed';
@@ -206,6 +260,7 @@ const AdminHR: React.FC = () => {
           <Tab label="Attendance" />
           <Tab label="Leave Requests" />
           <Tab label="Staff Directory" />
+          <Tab label="Monthly Sheet" />
         </Tabs>
 
         <TabPanel value={tabValue} index={0}>
@@ -258,11 +313,37 @@ const AdminHR: React.FC = () => {
         </TabPanel>
 
         <TabPanel value={tabValue} index={1}>
-          <Typography variant="h6" sx={{ mb: 2 }}>Leave Requests</Typography>
+          <Box sx={{ display: 'flex', alignItems: 'center', gap: 2, mb: 2 }}>
+            <Typography variant="h6" sx={{ flexGrow: 1 }}>Leave Requests</Typography>
+            <Button
+              variant="contained"
+              color="success"
+              onClick={() => handleBulkReview('approve')}
+              disabled={loading || selectedLeaves.length === 0}
+            >
+              Approve Selected
+            </Button>
+            <Button
+              variant="outlined"
+              color="error"
+              onClick={() => handleBulkReview('reject')}
+              disabled={loading || selectedLeaves.length === 0}
+            >
+              Reject Selected
+            </Button>
+          </Box>
           <TableContainer component={Paper}>
             <Table>
               <TableHead>
                 <TableRow>
+                  <TableCell padding="checkbox">
+                    <Checkbox
+                      indeterminate={selectedLeaves.length > 0 && selectedLeaves.length < pendingLeaveIds.length}
+                      checked={pendingLeaveIds.length > 0 && selectedLeaves.length === pendingLeaveIds.length}
+                      onChange={toggleAllLeaves}
+                      disabled={pendingLeaveIds.length === 0}
+                    />
+                  </TableCell>
                   <TableCell>Staff</TableCell>
                   <TableCell>Leave Type</TableCell>
                   <TableCell>Duration</TableCell>
@@ -274,6 +355,14 @@ const AdminHR: React.FC = () => {
               <TableBody>
                 {leaves.map((leave) => (
                   <TableRow key={leave.id}>
+                    <TableCell padding="checkbox">
+                      {leave.status === 'pending' && (
+                        <Checkbox
+                          checked={selectedLeaves.includes(leave.id)}
+                          onChange={() => toggleLeave(leave.id)}
+                        />
+                      )}
+                    </TableCell>
                     <TableCell>
                       <Box sx={{ display: 'flex', alignItems: 'center' }}>
                         <Avatar sx={{ mr: 2, width: 32, height: 32 }}>
@@ -369,6 +458,63 @@ const AdminHR: React.FC = () => {
             ))}
           </Box>
         </TabPanel>
+
+        <TabPanel value={tabValue} index={3}>
+          <Box sx={{ display: 'flex', alignItems: 'center', gap: 2, mb: 2 }}>
+            <Typography variant="h6">Monthly Attendance</Typography>
+            <TextField
+              type="month"
+              label="Month"
+              size="small"
+              value={matrixMonth}
+              onChange={(e) => setMatrixMonth(e.target.value)}
+              InputLabelProps={{ shrink: true }}
+            />
+          </Box>
+          {matrix && (
+            <>
+              <Typography variant="body2" color="text.secondary" sx={{ mb: 1 }}>
+                {Object.entries(matrix.codes)
+                  .filter(([, status]) => status)
+                  .map(([code, status]) => `${code} = ${status}`)
+                  .join(', ')}
+              </Typography>
+              <TableContainer component={Paper}>
+                <Table size="small">
+                  <TableHead>
+                    <TableRow>
+                      <TableCell>Staff</TableCell>
+                      {Array.from({ length: matrix.days }, (_, day) => (
+                        <TableCell key={day} align="center" sx={{ px: 0.5 }}>{day + 1}</TableCell>
+                      ))}
+                      {(['present', 'late', 'half_day', 'leave', 'absent'] as const).map((status) => (
+                        <TableCell key={status} align="right">{status.replace('_', ' ')}</TableCell>
+                      ))}
+                    </TableRow>
+                  </TableHead>
+                  <TableBody>
+                    {matrix.staff.map((row) => (
+                      <TableRow key={row.id}>
+                        <TableCell>
+                          {row.name}
+                          <Typography variant="caption" display="block" color="text.secondary">
+                            {row.employee_id} · {row.department}
+                          </Typography>
+                        </TableCell>
+                        {row.days.split('').map((code, day) => (
+                          <TableCell key={day} align="center" sx={{ px: 0.5 }}>{code}</TableCell>
+                        ))}
+                        {(['present', 'late', 'half_day', 'leave', 'absent'] as const).map((status) => (
+                          <TableCell key={status} align="right">{row.totals[status]}</TableCell>
+                        ))}
+                      </TableRow>
+                    ))}
+                  </TableBody>
+                </Table>
+              </TableContainer>
+            </>
+          )}
+        </TabPanel>
       </Paper>
     </Box>
   );
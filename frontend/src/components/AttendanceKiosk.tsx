@@ -0,0 +1,160 @@
+import React, { useState, useEffect, useCallback, useRef } from 'react';
+import {
+  Box,
+  Typography,
+  TextField,
+  Button,
+  Card,
+  CardContent,
+  Alert,
+  Chip,
+  List,
+  ListItem,
+  ListItemText,
+} from '@mui/material';
+import {
+  Login as LoginIcon,
+  Logout as LogoutIcon,
+  Sync as SyncIcon,
+} from '@mui/icons-material';
+import { apiService } from '../services/api';
+import { AttendancePunch, AttendanceSyncResult } from '../types';
+
+const SYNC_INTERVAL_MS = 60000;
+
+const outcomeLabels: Record<string, string> = {
+  applied: 'Recorded',
+  duplicate: 'Already recorded',
+  superseded: 'Superseded by an earlier punch',
+  out_before_in: 'Check-out before check-in',
+  no_check_in: 'Check-out without check-in',
+  unknown_staff: 'Unknown employee ID',
+};
+
+const readQueue = (): AttendancePunch[] => JSON.parse(localStorage.getItem('attendancePunches') || '[]');
+
+const AttendanceKiosk: React.FC = () => {
+  const [employeeId, setEmployeeId] = useState('');
+  const [queue, setQueue] = useState<AttendancePunch[]>(readQueue());
+  const [lastSync, setLastSync] = useState<AttendanceSyncResult | null>(null);
+  const [syncing, setSyncing] = useState(false);
+  const syncInFlight = useRef(false);
+  const [error, setError] = useState('');
+  const [success, setSuccess] = useState('');
+
+  // Punches are kept on the device and sent in batches, so the kiosk keeps working offline
+  const syncPunches = useCallback(async () => {
+    if (syncInFlight.current || readQueue().length === 0) {
+      return;
+    }
+    try {
+      syncInFlight.current = true;
+      setSyncing(true);
+      let result = await apiService.syncAttendancePunches();
+      while (result) {
+        setLastSync(result);
+        result = await apiService.syncAttendancePunches();
+      }
+      setError('');
+    } catch (error: any) {
+      setError(error.response?.data?.error || 'Sync failed; punches stay queued on this device');
+    } finally {
+      setQueue(readQueue());
+      syncInFlight.current = false;
+      setSyncing(false);
+    }
+  }, []);
+
+  useEffect(() => {
+    syncPunches();
+    const interval = setInterval(syncPunches, SYNC_INTERVAL_MS);
+    window.addEventListener('online', syncPunches);
+    return () => {
+      clearInterval(interval);
+      window.removeEventListener('online', syncPunches);
+    };
+  }, [syncPunches]);
+
+  const handlePunch = (type: 'in' | 'out') => {
+    const id = employeeId.trim();
+    if (!id) {
+      setError('Enter your employee ID');
+      return;
+    }
+    apiService.queueAttendancePunch(id, type);
+    setQueue(readQueue());
+    setEmployeeId('');
+    setError('');
+    setSuccess(`${id} checked ${type} at ${new Date().toLocaleTimeString()}`);
+    if (navigator.onLine) {
+      syncPunches();
+    }
+  };
+
+  const problems = lastSync?.results.filter((row) => row.outcome !== 'applied' && row.outcome !== 'duplicate') || [];
+
+  return (
+    <Box sx={{ p: 3, maxWidth: 640, mx: 'auto' }}>
+      <Typography variant="h4" sx={{ mb: 3 }}>Attendance Kiosk</Typography>
+
+      {error && <Alert severity="error" sx={{ mb: 2 }} onClose={() => setError('')}>{error}</Alert>}
+      {success && <Alert severity="success" sx={{ mb: 2 }} onClose={() => setSuccess('')}>{success}</Alert>}
+
+      <Card sx={{ mb: 3 }}>
+        <CardContent>
+          <TextField
+            fullWidth
+            autoFocus
+            label="Employee ID"
+            value={employeeId}
+            onChange={(e) => setEmployeeId(e.target.value)}
+            sx={{ mb: 2 }}
+          />
+          <Box sx={{ display: 'flex', gap: 2 }}>
+            <Button fullWidth variant="contained" color="success" startIcon={<LoginIcon />} onClick={() => handlePunch('in')}>
+              Check In
+            </Button>
+            <Button fullWidth variant="contained" color="error" startIcon={<LogoutIcon />} onClick={() => handlePunch('out')}>
+              Check Out
+            </Button>
+          </Box>
+        </CardContent>
+      </Card>
+
+      <Card>
+        <CardContent>
+          <Box sx={{ display: 'flex', alignItems: 'center', gap: 2, mb: 2 }}>
+            <Typography variant="h6" sx={{ flexGrow: 1 }}>Sync</Typography>
+            <Chip label={`${queue.length} queued`} color={queue.length ? 'warning' : 'default'} size="small" />
+            <Button size="small" startIcon={<SyncIcon />} onClick={syncPunches} disabled={syncing || queue.length === 0}>
+              Sync Now
+            </Button>
+          </Box>
+          {lastSync ? (
+            <>
+              <Typography variant="body2" color="text.secondary">
+                Last sync: {lastSync.created} created, {lastSync.updated} updated
+              </Typography>
+              {problems.length > 0 && (
+                <List dense>
+                  {problems.map((row) => (
+                    <ListItem key={row.index}>
+                      <ListItemText
+                        primary={`${row.employee_id} (${row.type})`}
+                        secondary={outcomeLabels[row.outcome] || row.outcome}
+                      />
+                    </ListItem>
+                  ))}
+                </List>
+              )}
+            </>
+          ) : (
+            <Typography variant="body2" color="text.secondary">No punches synced yet</Typography>
+          )}
+        </CardContent>
+      </Card>
+    </Box>
+  );
+};
+
+export default AttendanceKiosk;
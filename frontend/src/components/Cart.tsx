@@ -100,6 +100,25 @@ const Cart: React.FC = () => {
     return Object.values(cart).reduce((total, item) => total + item.quantity, 0);
   };
 
+  const refreshCartFromMenu = async () => {
+    // Reloading the menu also stores its current version for the next attempt
+    try {
+      const menuItems = await apiService.getMenuItems();
+      const byId = new Map(menuItems.map(item => [item.id, item]));
+      const refreshed: Record<number, CartItem> = {};
+      Object.values(cart).forEach(item => {
+        const current = byId.get(item.id);
+        if (current && current.is_available) {
+          refreshed[item.id] = { ...item, name: current.name, price: String(current.price) };
+        }
+      });
+      setCart(refreshed);
+      localStorage.setItem('cart', JSON.stringify(refreshed));
+    } catch (error) {
+      // Keep the cart as it is; the next attempt gets another 409 with the changes
+    }
+  };
+
   const handlePlaceOrder = async () => {
     if (getTotalItems() === 0) {
       setError('Your cart is empty');
@@ -122,7 +141,9 @@ const Cart: React.FC = () => {
         table_unique_id: tableUniqueId,
         room_unique_id: roomUniqueId,
         special_instructions: specialInstructions,
-        total_amount: String(getTotalPrice())
+        total_amount: String(getTotalPrice()),
+        // Lets the server reject orders built from an outdated menu
+        catalog_version: localStorage.getItem('menuVersion') || undefined
       };
 
       const createdOrder = await apiService.createOrder(orderData);
@@ -150,7 +171,23 @@ const Cart: React.FC = () => {
         setSuccess('Order placed successfully! You can track your order or return to menu for additional orders.');
       }, 2000);
     } catch (error: any) {
-      setError(error.response?.data?.error || 'Failed to place order');
+      const data = error.response?.data;
+      if (error.response?.status === 409 && data?.changed_lines) {
+        // The menu moved on and some of these items changed: pick up the new
+        // version and prices, then let the customer review before resubmitting
+        if (data.catalog_version) {
+          localStorage.setItem('menuVersion', data.catalog_version);
+        }
+        await refreshCartFromMenu();
+        const changes = data.changed_lines.map((line: any) => {
+          const name = line.name || cart[line.menu_item]?.name || `Item ${line.menu_item}`;
+          if (!line.is_available) return `${name} is no longer available`;
+          return `${name} is now ₹${line.current_price} (was ₹${line.price})`;
+        });
+        setError(`${data.error} ${changes.join('; ')}`);
+      } else {
+        setError(data?.error || 'Failed to place order');
+      }
     } finally {
       setLoading(false);
     }
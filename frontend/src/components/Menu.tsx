@@ -25,6 +25,8 @@ import {
   useMediaQuery,
   Tabs,
   Tab,
+  TextField,
+  InputAdornment,
 } from '@mui/material';
 import {
   Add as AddIcon,
@@ -35,11 +37,20 @@ import {
   CheckCircle as CheckCircleIcon,
   Schedule as ScheduleIcon,
   Receipt as ReceiptIcon,
+  Search as SearchIcon,
 } from '@mui/icons-material';
 import { useSearchParams } from 'react-router-dom';
 import { MenuItem, Table } from '../types';
 import { apiService } from '../services/api';
 
+// Rendered card width per grid breakpoint (1, 2, 3 or 4 columns)
+const IMAGE_SIZES = '(min-width: 1536px) 25vw, (min-width: 1200px) 33vw, (min-width: 600px) 50vw, 100vw';
+
+const buildSrcSet = (item: MenuItem, format: 'webp' | 'jpeg') =>
+  Object.values(item.image_srcset || {})
+    .map(variant => `${variant[format]} ${variant.width}w`)
+    .join(', ');
+
 const Menu: React.FC = () => {
   const [searchParams] = useSearchParams();
   const [menuItems, setMenuItems] = useState<MenuItem[]>([]);
@@ -50,6 +61,8 @@ const Menu: React.FC = () => {
   const [showOrderSuccess, setShowOrderSuccess] = useState(false);
   const [cartDrawerOpen, setCartDrawerOpen] = useState(false);
   const [selectedCategory, setSelectedCategory] = useState<string>('all');
+  const [searchQuery, setSearchQuery] = useState('');
+  const [searchResults, setSearchResults] = useState<MenuItem[] | null>(null);
 
   const theme = useTheme();
 
@@ -57,13 +70,10 @@ const Menu: React.FC = () => {
   const roomUniqueId = searchParams.get('room');
 
   useEffect(() => {
-    loadMenu();
-    if (tableUniqueId) {
-      loadTableInfo();
-      loadExistingOrders(tableUniqueId, 'table');
-    } else if (roomUniqueId) {
-      loadRoomInfo();
-      loadExistingOrders(roomUniqueId, 'room');
+    if (tableUniqueId || roomUniqueId) {
+      loadSession();
+    } else {
+      loadMenu();
     }
     // Load saved cart if coming back
     const savedCart = localStorage.getItem('cart');
@@ -101,53 +111,55 @@ const Menu: React.FC = () => {
     }
   };
 
-  const loadTableInfo = async () => {
+  const loadSession = async () => {
     try {
-      const tables = await apiService.getTables();
-      const table = tables.find(t => t.qr_unique_id === tableUniqueId);
-      setTableInfo(table || null);
+      const session = await apiService.getSessionBootstrap(
+        tableUniqueId ? { table: tableUniqueId } : { room: roomUniqueId || undefined }
+      );
+      setMenuItems(session.menu);
+      localStorage.setItem('menuVersion', session.menu_version);
+      setTableInfo({
+        id: session.target.id,
+        table_number: session.target.number,
+        qr_unique_id: session.target.qr_unique_id,
+        floor: session.target.floor,
+        is_active: session.target.is_active,
+      } as Table);
+      setExistingOrders(session.orders.filter((order: any) =>
+        ['pending', 'preparing', 'ready'].includes(order.status.toLowerCase())
+      ));
     } catch (error) {
-      console.error('Failed to load table info:', error);
+      console.error('Failed to load session:', error);
+      // Unknown or unreachable QR session: still show the menu
+      await loadMenu();
+    } finally {
+      setLoading(false);
     }
   };
 
-  const loadRoomInfo = async () => {
-    try {
-      const rooms = await apiService.getRooms();
-      const room = rooms.find(r => r.qr_unique_id === roomUniqueId);
-      if (room) {
-        setTableInfo({
-          id: room.id,
-          table_name: room.room_name,
-          table_number: room.room_number,
-          capacity: room.capacity,
-          qr_unique_id: room.qr_unique_id,
-          is_occupied: room.is_active || false,
-          floor: room.floor,
-          is_active: room.is_active,
-          created_at: room.created_at,
-        } as Table);
-      }
-    } catch (error) {
-      console.error('Failed to load room info:', error);
+  // Ranked full-text search runs on the server; debounce so typing doesn't fire a request per key
+  useEffect(() => {
+    const q = searchQuery.trim();
+    if (!q) {
+      setSearchResults(null);
+      return;
     }
-  };
-
-  const loadExistingOrders = async (uniqueId: string, type: 'table' | 'room') => {
-    try {
-      let orders;
-      if (type === 'table') {
-        orders = await apiService.getOrdersByTableUniqueId(uniqueId);
-      } else {
-        orders = await apiService.getOrdersByRoomUniqueId(uniqueId);
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const data = await apiService.searchMenu(q, 50);
+        if (!cancelled) {
+          setSearchResults(data.results);
+        }
+      } catch (error) {
+        console.error('Menu search failed:', error);
       }
-      setExistingOrders(orders.filter((order: any) => 
-        ['pending', 'preparing', 'ready'].includes(order.status.toLowerCase())
-      ));
-    } catch (error) {
-      console.error('Failed to load existing orders:', error);
-    }
-  };
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [searchQuery]);
 
   const getCategories = () => {
     const categories = Array.from(new Set(menuItems.map(item => item.category)));
@@ -155,10 +167,11 @@ const Menu: React.FC = () => {
   };
 
   const getFilteredItems = () => {
+    const items = searchResults ?? menuItems;
     if (selectedCategory === 'all') {
-      return menuItems;
+      return items;
     }
-    return menuItems.filter(item => item.category === selectedCategory);
+    return items.filter(item => item.category === selectedCategory);
   };
 
   const addToCart = (item: MenuItem) => {
@@ -346,6 +359,23 @@ const Menu: React.FC = () => {
           </Box>
         </Box>
 
+        {/* Search */}
+        <TextField
+          fullWidth
+          size="small"
+          placeholder="Search dishes, drinks and categories"
+          value={searchQuery}
+          onChange={(e) => setSearchQuery(e.target.value)}
+          InputProps={{
+            startAdornment: (
+              <InputAdornment position="start">
+                <SearchIcon sx={{ color: '#9ca3af' }} />
+              </InputAdornment>
+            ),
+          }}
+          sx={{ mb: 2 }}
+        />
+
         {/* Category Tabs */}
         <Box sx={{ mb: 3 }}>
           <Tabs
@@ -422,11 +452,26 @@ const Menu: React.FC = () => {
                 alignItems: 'center',
                 justifyContent: 'center'
               }}>
-                {item.image_url ? (
+                {item.image_srcset ? (
+                  <Box component="picture" sx={{ width: '100%', height: 200, display: 'block' }}>
+                    <source type="image/webp" srcSet={buildSrcSet(item, 'webp')} sizes={IMAGE_SIZES} />
+                    <CardMedia
+                      component="img"
+                      height="200"
+                      image={item.image_srcset.card.jpeg}
+                      srcSet={buildSrcSet(item, 'jpeg')}
+                      sizes={IMAGE_SIZES}
+                      loading="lazy"
+                      alt={item.name}
+                      sx={{ objectFit: 'cover' }}
+                    />
+                  </Box>
+                ) : item.image_url ? (
                   <CardMedia
                     component="img"
                     height="200"
                     image={item.image_url}
+                    loading="lazy"
                     alt={item.name}
                     sx={{ objectFit: 'cover' }}
                   />
@@ -20,11 +20,15 @@ import {
   MenuItem as MuiMenuItem,
   Chip,
   CardMedia,
+  Checkbox,
+  FormControlLabel,
 } from '@mui/material';
 import {
   Add as AddIcon,
   Edit as EditIcon,
   Delete as DeleteIcon,
+  FileUpload as FileUploadIcon,
+  FileDownload as FileDownloadIcon,
 } from '@mui/icons-material';
 import { useAuth } from '../context/AuthContext';
 import apiService from '../services/api';
@@ -38,6 +42,11 @@ const MenuManagement: React.FC = () => {
   const [success, setSuccess] = useState('');
   const [openDialog, setOpenDialog] = useState(false);
   const [editingItem, setEditingItem] = useState<MenuItemType | null>(null);
+  const [importOpen, setImportOpen] = useState(false);
+  const [importFile, setImportFile] = useState<File | null>(null);
+  const [deleteMissing, setDeleteMissing] = useState(false);
+  const [importSummary, setImportSummary] = useState<any>(null);
+  const [importErrors, setImportErrors] = useState<string[]>([]);
   const [newItem, setNewItem] = useState({
     name: '',
     category: '',
@@ -137,6 +146,39 @@ const MenuManagement: React.FC = () => {
     );
   }
 
+  const handleCloseImportDialog = () => {
+    setImportOpen(false);
+    setImportFile(null);
+    setDeleteMissing(false);
+    setImportSummary(null);
+    setImportErrors([]);
+  };
+
+  // Bulk changes go through one transactional import; a dry run previews the counts first
+  const handleImport = async (dryRun: boolean) => {
+    if (!importFile) {
+      return;
+    }
+    try {
+      setImportErrors([]);
+      const summary = await apiService.importMenu(importFile, { dryRun, deleteMissing });
+      setImportSummary(summary);
+      if (!dryRun) {
+        setSuccess(`Menu imported: ${summary.created} created, ${summary.updated} updated, ${summary.deleted} deleted`);
+        handleCloseImportDialog();
+        loadMenuItems();
+      }
+    } catch (error: any) {
+      setImportSummary(null);
+      const rowErrors: Array<{ row: number | null; error: string }> | undefined = error.response?.data?.errors;
+      setImportErrors(
+        rowErrors
+          ? rowErrors.map((row) => (row.row === null ? row.error : `Row ${row.row}: ${row.error}`))
+          : [error.response?.data?.error || 'Failed to import menu']
+      );
+    }
+  };
+
   return (
     <Container maxWidth="xl" sx={{ mt: 4, mb: 4 }}>
       <Typography variant="h4" component="h1" sx={{ mb: 3 }}>
@@ -157,15 +199,83 @@ const MenuManagement: React.FC = () => {
 
       <Box sx={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', mb: 3 }}>
         <Typography variant="h6">Menu Items</Typography>
-        <Button
-          variant="contained"
-          startIcon={<AddIcon />}
-          onClick={handleOpenCreateDialog}
-        >
-          ADD MENU ITEM
-        </Button>
+        <Box sx={{ display: 'flex', gap: 1 }}>
+          <Button
+            variant="outlined"
+            startIcon={<FileDownloadIcon />}
+            href={apiService.getMenuExportUrl('csv')}
+          >
+            EXPORT CSV
+          </Button>
+          <Button
+            variant="outlined"
+            startIcon={<FileDownloadIcon />}
+            href={apiService.getMenuExportUrl('json')}
+          >
+            EXPORT JSON
+          </Button>
+          <Button
+            variant="outlined"
+            startIcon={<FileUploadIcon />}
+            onClick={() => setImportOpen(true)}
+          >
+            IMPORT
+          </Button>
+          <Button
+            variant="contained"
+            startIcon={<AddIcon />}
+            onClick={handleOpenCreateDialog}
+          >
+            ADD MENU ITEM
+          </Button>
+        </Box>
       </Box>
 
+      <Dialog open={importOpen} onClose={handleCloseImportDialog} maxWidth="sm" fullWidth>
+        <DialogTitle>Import Menu</DialogTitle>
+        <DialogContent>
+          <Typography variant="body2" color="text.secondary" sx={{ mb: 2 }}>
+            Upload a CSV or JSON file in the export format. Rows are matched by name.
+          </Typography>
+          <Button variant="outlined" component="label" sx={{ mb: 2 }}>
+            {importFile ? importFile.name : 'Choose File'}
+            <input
+              hidden
+              type="file"
+              accept=".csv,.json"
+              onChange={(e) => {
+                setImportFile(e.target.files?.[0] || null);
+                setImportSummary(null);
+                setImportErrors([]);
+              }}
+            />
+          </Button>
+          <FormControlLabel
+            control={<Checkbox checked={deleteMissing} onChange={(e) => setDeleteMissing(e.target.checked)} />}
+            label="Delete items missing from the file"
+            sx={{ display: 'block' }}
+          />
+          {importSummary && (
+            <Alert severity="info" sx={{ mt: 2 }}>
+              {importSummary.dry_run ? 'Preview: ' : ''}
+              {importSummary.created} created, {importSummary.updated} updated, {importSummary.unchanged} unchanged, {importSummary.deleted} deleted
+            </Alert>
+          )}
+          {importErrors.length > 0 && (
+            <Alert severity="error" sx={{ mt: 2 }}>
+              {importErrors.map((message, index) => (
+                <div key={index}>{message}</div>
+              ))}
+            </Alert>
+          )}
+        </DialogContent>
+        <DialogActions>
+          <Button onClick={handleCloseImportDialog}>Cancel</Button>
+          <Button onClick={() => handleImport(true)} disabled={!importFile}>Preview</Button>
+          <Button variant="contained" onClick={() => handleImport(false)} disabled={!importFile}>Import</Button>
+        </DialogActions>
+      </Dialog>
+
       <Box sx={{ display: 'grid', gridTemplateColumns: 'repeat(auto-fill, minmax(300px, 1fr))', gap: 3 }}>
         {menuItems.map((item) => (
           <Card key={item.id}>
@@ -32,6 +32,7 @@ import {
   Login as LoginIcon,
   PersonAdd as SignupIcon,
   Work as HRIcon,
+  Fingerprint as KioskIcon,
   Receipt as ReceiptIcon,
   Refresh as RefreshIcon,
   Close as CloseIcon,
@@ -71,6 +72,7 @@ const adminItems: MenuItemConfig[] = [
   { label: 'Menu Management', icon: <RestaurantIcon />, path: '/manage-menu' },
   { label: 'Staff Portal', icon: <DashboardIcon />, path: '/staff-portal' },
   { label: 'HR Admin', icon: <HRIcon />, path: '/admin-hr' },
+  { label: 'Attendance Kiosk', icon: <KioskIcon />, path: '/attendance-kiosk' },
   { label: 'Orders', icon: <OrderIcon />, path: '/manage-orders' },
 ];
 
@@ -66,6 +66,8 @@ const StaffManagement: React.FC = () => {
 
   // Staff state
   const [staff, setStaff] = useState<Staff[]>([]);
+  const [staffQuery, setStaffQuery] = useState('');
+  const [staffResults, setStaffResults] = useState<Staff[] | null>(null);
   const [departments, setDepartments] = useState<Department[]>([]);
   const [roles, setRoles] = useState<Role[]>([]);
   const [openStaffDialog, setOpenStaffDialog] = useState(false);
@@ -112,6 +114,24 @@ const StaffManagement: React.FC = () => {
     loadData();
   }, []);
 
+  // Search runs on the server against the staff index, debounced while typing
+  useEffect(() => {
+    const q = staffQuery.trim();
+    if (!q) {
+      setStaffResults(null);
+      return;
+    }
+    const timer = setTimeout(async () => {
+      try {
+        const data = await apiService.searchStaff(q, 50);
+        setStaffResults(data.results);
+      } catch (error: any) {
+        setError(error.response?.data?.error || 'Failed to search staff');
+      }
+    }, 250);
+    return () => clearTimeout(timer);
+  }, [staffQuery]);
+
   const loadData = async () => {
     try {
       const [staffData, deptData, roleData] = await Promise.all([
@@ -345,6 +365,13 @@ const StaffManagement: React.FC = () => {
         <TabPanel value={tabValue} index={0}>
           <Box sx={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', mb: 3 }}>
             <Typography variant="h6">Staff Members</Typography>
+            <TextField
+              size="small"
+              placeholder="Search by name, ID, phone or email"
+              value={staffQuery}
+              onChange={(e) => setStaffQuery(e.target.value)}
+              sx={{ ml: 'auto', mr: 2, minWidth: 280 }}
+            />
             <Button
               variant="contained"
               startIcon={<AddIcon />}
@@ -360,7 +387,7 @@ const StaffManagement: React.FC = () => {
             </Box>
           ) : (
             <Box sx={{ display: 'grid', gridTemplateColumns: 'repeat(auto-fill, minmax(300px, 1fr))', gap: 3 }}>
-              {staff.map((member) => (
+              {(staffResults ?? staff).map((member) => (
                 <Card key={member.id}>
                   <CardContent>
                     <Box sx={{ display: 'flex', alignItems: 'center', mb: 2 }}>
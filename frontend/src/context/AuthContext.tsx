@@ -30,6 +30,10 @@ export const AuthProvider: React.FC<AuthProviderProps> = ({ children }) => {
   const login = async (credentials: LoginRequest): Promise<void> => {
     try {
       const userData = await apiService.login(credentials.phone, credentials.password);
+      if (userData.is_superuser || userData.cafe_manager || userData.staff_profile) {
+        // Staff devices also hold a bearer token; the session cookie still works without one
+        await apiService.getStaffToken().catch(() => null);
+      }
       setUser(userData);
     } catch (error) {
       throw error;
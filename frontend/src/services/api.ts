@@ -15,7 +15,12 @@ import {
   Bill,
   SignupRequest,
   OrderRequest,
-  DashboardStats
+  DashboardStats,
+  SessionBootstrap,
+  StaffToken,
+  AttendanceMatrix,
+  AttendancePunch,
+  AttendanceSyncResult
 } from '../types';
 
 // Dynamic backend URL detection
@@ -33,6 +38,52 @@ const getBackendUrl = () => {
 axios.defaults.baseURL = getBackendUrl();
 axios.defaults.withCredentials = true;
 
+// Staff devices (kitchen tablets) authenticate with a signed bearer token when one is
+// stored. It is only sent to staff routes, so guest screens (menu, ordering, QR
+// bootstrap) keep working whatever state the token is in.
+const STAFF_ROUTE_RE = /^\/api\/(tables|rooms|floors|departments|roles|staff|attendance|leaves|payroll|orders|bills|dashboard|exports)\/|^\/api\/auth\/current_user\/|^\/api\/menu\/(export|import)\//;
+
+const isStaffRoute = (url?: string, method?: string) => {
+  if (!url) return false;
+  if (STAFF_ROUTE_RE.test(url)) return true;
+  // Menu reads are public; changes to it are staff-only
+  return url.startsWith('/api/menu/') && (method || 'get').toLowerCase() !== 'get';
+};
+
+axios.interceptors.request.use((config) => {
+  const staffToken = localStorage.getItem('staffToken');
+  if (staffToken && config.headers && !config.headers.Authorization && isStaffRoute(config.url, config.method)) {
+    config.headers.Authorization = `Bearer ${staffToken}`;
+  }
+  return config;
+});
+
+// Access tokens expire after a few minutes: on a 401 for a request that carried one,
+// refresh it once and retry. If it can no longer be refreshed it is dropped, and the
+// request is retried on the session cookie alone.
+let tokenRefresh: Promise<string | null> | null = null;
+
+axios.interceptors.response.use(undefined, async (error) => {
+  const config = error.config;
+  const sentToken = config?.headers?.Authorization;
+  if (error.response?.status !== 401 || !sentToken || config._tokenRetried) {
+    return Promise.reject(error);
+  }
+  config._tokenRetried = true;
+  if (!tokenRefresh) {
+    tokenRefresh = apiService.refreshStaffToken()
+      .then(result => (result ? result.token : null))
+      .finally(() => { tokenRefresh = null; });
+  }
+  const freshToken = await tokenRefresh;
+  if (freshToken) {
+    config.headers.Authorization = `Bearer ${freshToken}`;
+  } else {
+    delete config.headers.Authorization;
+  }
+  return axios(config);
+});
+
 // API service class
 class ApiService {
   // Auth endpoints
@@ -47,6 +98,7 @@ class ApiService {
   }
 
   async logout(): Promise<void> {
+    localStorage.removeItem('staffToken');
     try {
       await axios.post('/api/auth/logout/');
     } catch (error) {
@@ -64,9 +116,55 @@ class ApiService {
     }
   }
 
+  async getStaffToken(phone?: string, password?: string): Promise<StaffToken> {
+    const response: AxiosResponse<StaffToken> = await axios.post(
+      '/api/auth/token/',
+      phone ? { phone, password } : {}
+    );
+    localStorage.setItem('staffToken', response.data.token);
+    return response.data;
+  }
+
+  async refreshStaffToken(): Promise<StaffToken | null> {
+    const token = localStorage.getItem('staffToken');
+    if (!token) {
+      return null;
+    }
+    try {
+      const response: AxiosResponse<StaffToken> = await axios.post('/api/auth/token/refresh/', { token });
+      localStorage.setItem('staffToken', response.data.token);
+      return response.data;
+    } catch (error) {
+      localStorage.removeItem('staffToken');
+      return null;
+    }
+  }
+
   // Menu endpoints
   async getMenuItems(): Promise<MenuItem[]> {
     const response: AxiosResponse<MenuItem[]> = await axios.get('/api/menu/');
+    const menuVersion = response.headers['x-menu-version'];
+    if (menuVersion) {
+      localStorage.setItem('menuVersion', menuVersion);
+    }
+    return response.data;
+  }
+
+  async importMenu(file: File, options: { dryRun?: boolean; deleteMissing?: boolean } = {}): Promise<any> {
+    const formData = new FormData();
+    formData.append('file', file);
+    const response = await axios.post('/api/menu/import/', formData, {
+      params: { dry_run: options.dryRun ? 1 : undefined, delete_missing: options.deleteMissing ? 1 : undefined }
+    });
+    return response.data;
+  }
+
+  getMenuExportUrl(format: 'csv' | 'json' = 'csv'): string {
+    return `${axios.defaults.baseURL}/api/menu/export/?format=${format}`;
+  }
+
+  async searchMenu(q: string, limit = 20, offset = 0): Promise<{ query: string; results: MenuItem[]; next_offset: number | null }> {
+    const response = await axios.get('/api/menu/search/', { params: { q, limit, offset } });
     return response.data;
   }
 
@@ -84,6 +182,12 @@ class ApiService {
     await axios.delete(`/api/menu/${menuId}/`);
   }
 
+  // Guest session bootstrap: table/room identity, menu, open orders and bills
+  async getSessionBootstrap(params: { table?: string; room?: string }): Promise<SessionBootstrap> {
+    const response: AxiosResponse<SessionBootstrap> = await axios.get('/api/session/bootstrap/', { params });
+    return response.data;
+  }
+
   // Table endpoints
   async getTables(): Promise<Table[]> {
     const response: AxiosResponse<Table[]> = await axios.get('/api/tables/');
@@ -302,6 +406,11 @@ class ApiService {
     return response.data;
   }
 
+  async searchStaff(q: string, limit = 20, offset = 0): Promise<{ query: string; results: Staff[]; next_offset: number | null }> {
+    const response = await axios.get('/api/staff/search/', { params: { q, limit, offset } });
+    return response.data;
+  }
+
   async getActiveStaff(): Promise<Staff[]> {
     const response: AxiosResponse<Staff[]> = await axios.get('/api/staff/active_staff/');
     return response.data;
@@ -332,6 +441,35 @@ class ApiService {
     return response.data;
   }
 
+  // Kiosk mode: punches are queued in localStorage and survive going offline
+  queueAttendancePunch(employeeId: string, type: 'in' | 'out'): void {
+    const queue: AttendancePunch[] = JSON.parse(localStorage.getItem('attendancePunches') || '[]');
+    queue.push({ employee_id: employeeId, type, timestamp: new Date().toISOString() });
+    localStorage.setItem('attendancePunches', JSON.stringify(queue));
+  }
+
+  async syncAttendancePunches(): Promise<AttendanceSyncResult | null> {
+    const queue: AttendancePunch[] = JSON.parse(localStorage.getItem('attendancePunches') || '[]');
+    if (queue.length === 0) {
+      return null;
+    }
+    const batch = queue.slice(0, 1000);
+    const response: AxiosResponse<AttendanceSyncResult> = await axios.post('/api/attendance/sync/', { punches: batch });
+    // Every punch gets an outcome, so the synced batch can be dropped; replays are harmless anyway
+    const remaining: AttendancePunch[] = JSON.parse(localStorage.getItem('attendancePunches') || '[]').slice(batch.length);
+    localStorage.setItem('attendancePunches', JSON.stringify(remaining));
+    return response.data;
+  }
+
+  async getAttendanceMatrix(month: string, department?: number): Promise<AttendanceMatrix> {
+    const params: Record<string, string | number> = { month };
+    if (department) {
+      params.department = department;
+    }
+    const response: AxiosResponse<AttendanceMatrix> = await axios.get('/api/attendance/matrix/', { params });
+    return response.data;
+  }
+
   async createAttendance(attendanceData: Partial<Attendance>): Promise<Attendance> {
     const response: AxiosResponse<Attendance> = await axios.post('/api/attendance/', attendanceData);
     return response.data;
@@ -388,6 +526,14 @@ class ApiService {
     return response.data;
   }
 
+  async reviewLeaves(
+    ids: number[],
+    decision: 'approve' | 'reject'
+  ): Promise<{ decision: string; updated: number; results: Array<{ id: number; outcome: string; status?: string }> }> {
+    const response = await axios.post('/api/leaves/bulk_review/', { ids, decision });
+    return response.data;
+  }
+
   // Staff-specific methods
   async getStaffAttendance(staffId: number): Promise<Attendance[]> {
     const response: AxiosResponse<Attendance[]> = await axios.get(`/api/attendance/?staff=${staffId}`);
@@ -18,6 +18,8 @@ export interface Floor {
   is_active: boolean;
   created_at: string;
   table_count?: number;
+  active_table_count?: number;
+  room_count?: number;
   rooms?: Room[];
 }
 
@@ -142,6 +144,13 @@ export interface Room {
 }
 
 // Menu item types
+export interface ImageVariant {
+  width: number;
+  height: number;
+  webp: string;
+  jpeg: string;
+}
+
 export interface MenuItem {
   id: number;
   name: string;
@@ -149,6 +158,7 @@ export interface MenuItem {
   description: string;
   image?: string;
   image_url?: string;
+  image_srcset?: Record<'thumb' | 'card' | 'full', ImageVariant> | null;
   price: string;
   list_order: number;
   is_available: boolean;
@@ -194,6 +204,23 @@ export interface Bill {
   table_number?: string;
 }
 
+// Guest session bootstrap (one round trip after scanning a QR code)
+export interface SessionBootstrap {
+  target: {
+    kind: 'table' | 'room';
+    id: number;
+    number: string;
+    floor?: number;
+    is_active: boolean;
+    qr_unique_id: string;
+  };
+  menu_version: string;
+  menu: MenuItem[];
+  // Open orders and the current sitting's bills, without phone numbers
+  orders: Omit<Order, 'phone'>[];
+  bills: Omit<Bill, 'phone'>[];
+}
+
 // Cart types
 export interface CartItem {
   id: number;
@@ -233,8 +260,10 @@ export interface OrderRequest {
     price: string;
   }>;
   table_unique_id?: string;
+  room_unique_id?: string;
   special_instructions?: string;
   total_amount: string;
+  catalog_version?: string;
 }
 
 export interface DashboardStats {
@@ -249,6 +278,46 @@ export interface DashboardStats {
   popular_items: MenuItem[];
 }
 
+// Clock event recorded by the attendance kiosk and synced in batches
+export interface AttendancePunch {
+  employee_id: string;
+  type: 'in' | 'out';
+  timestamp: string;
+}
+
+export interface AttendanceSyncResult {
+  created: number;
+  updated: number;
+  results: Array<{
+    index: number;
+    employee_id: string;
+    type: 'in' | 'out';
+    outcome: 'applied' | 'duplicate' | 'superseded' | 'out_before_in' | 'no_check_in' | 'unknown_staff';
+  }>;
+}
+
+// Monthly attendance sheet; `days` holds one status code per day of the month
+export interface AttendanceMatrix {
+  month: string;
+  days: number;
+  codes: Record<string, string | null>;
+  staff: Array<{
+    id: number;
+    employee_id: string;
+    name: string;
+    department: string;
+    days: string;
+    totals: Record<'present' | 'late' | 'half_day' | 'leave' | 'absent', number>;
+  }>;
+}
+
+// Signed bearer token for shared staff devices
+export interface StaffToken {
+  token: string;
+  token_type: 'Bearer';
+  expires_in: number;
+}
+
 // Auth context types
 export interface AuthContextType {
   user: User | null;
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 import os
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -74,6 +75,7 @@ MIDDLEWARE = [
     'cafe.middleware.CsrfExemptMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'cafe.middleware.ReplicaPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -93,6 +95,9 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Let the React app read menu versioning headers
+CORS_EXPOSE_HEADERS = ['ETag', 'X-Menu-Version']
+
 # CSRF settings for API - dynamic
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:3000",
@@ -110,6 +115,7 @@ CSRF_TRUSTED_ORIGINS = [
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
+        'cafe.authentication.SignedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -142,13 +148,55 @@ WSGI_APPLICATION = 'pr1.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases
 
+# SQLite production profile, applied to every new connection. WAL lets readers run
+# alongside the single writer, and synchronous=NORMAL is safe with WAL (a power
+# cut can lose the last commits, never corrupt the file). Writes take the lock
+# up front (IMMEDIATE) and wait up to SQLITE_BUSY_TIMEOUT seconds for it instead
+# of failing with "database is locked". Connections are kept for DB_CONN_MAX_AGE
+# seconds and checked before reuse. Compare profiles with `manage.py bench_sqlite`.
+SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'wal')
+SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'normal')
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+SQLITE_BUSY_TIMEOUT = float(os.environ.get('SQLITE_BUSY_TIMEOUT', 5))
+SQLITE_INIT_COMMAND = ';'.join([
+    f'PRAGMA journal_mode={SQLITE_JOURNAL_MODE}',
+    f'PRAGMA synchronous={SQLITE_SYNCHRONOUS}',
+    f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}',
+    # Negative cache_size is in KiB rather than pages
+    f'PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}',
+])
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', '1') == '1',
+        'OPTIONS': {
+            'init_command': SQLITE_INIT_COMMAND,
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': SQLITE_BUSY_TIMEOUT,
+        },
     }
 }
 
+# Optional read replica for reporting traffic (see cafe/replica.py). Point
+# REPLICA_DB_NAME at a second SQLite file kept fresh by `manage.py sync_replica`.
+# Dashboard, bill list, attendance matrix and export reads use it while it is
+# at most REPLICA_MAX_LAG seconds behind; clients that just wrote stay on the
+# primary until the replica has caught up with their write.
+REPLICA_DB_NAME = os.environ.get('REPLICA_DB_NAME')
+REPLICA_MAX_LAG = float(os.environ.get('REPLICA_MAX_LAG', 30))
+REPLICA_LAG_CHECK_SECONDS = float(os.environ.get('REPLICA_LAG_CHECK_SECONDS', 2))
+if REPLICA_DB_NAME:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': REPLICA_DB_NAME,
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['cafe.replica.ReportingReplicaRouter']
+
 # Password validation
 # https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
 
@@ -198,3 +246,87 @@ STATIC_URL = 'static/'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media/')
+
+# In-process QR id -> table/room resolver cache (see cafe/caches.py)
+QR_RESOLVER_CACHE_SIZE = int(os.environ.get('QR_RESOLVER_CACHE_SIZE', 2048))
+QR_RESOLVER_CACHE_TTL = int(os.environ.get('QR_RESOLVER_CACHE_TTL', 300))
+
+# Background threads that resize uploaded menu images (see cafe/images.py)
+IMAGE_VARIANT_WORKERS = int(os.environ.get('IMAGE_VARIANT_WORKERS', 2))
+
+# Server-side order pricing (see cafe/pricing.py); rates are fractions of the subtotal
+ORDER_TAX_RATE = os.environ.get('ORDER_TAX_RATE', '0')
+ORDER_SERVICE_CHARGE_RATE = os.environ.get('ORDER_SERVICE_CHARGE_RATE', '0')
+
+# Shared cache for the menu version token and cached sessions. The default is
+# per-process; point CACHE_BACKEND/CACHE_LOCATION at a file or Redis cache when
+# running more than one worker.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# Session storage: 'cached_db' serves reads from the cache and only writes through
+# to django_session on change; 'signed_cookies' keeps sessions off the server entirely.
+# cached_db is only the default with a shared cache: on a per-process cache another
+# worker could keep serving a session that was logged out or rotated elsewhere.
+_SHARED_CACHE = CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'cached_db' if _SHARED_CACHE else 'db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESSION_BACKEND]
+SESSION_COOKIE_AGE = int(os.environ.get('SESSION_COOKIE_AGE', 60 * 60 * 24 * 14))
+
+# Signed bearer tokens for staff devices (see cafe/authentication.py). Tokens are
+# verified without a database hit for STAFF_TOKEN_TTL seconds and can be
+# refreshed, re-checking the user, until STAFF_TOKEN_REFRESH_WINDOW has passed.
+STAFF_TOKEN_TTL = int(os.environ.get('STAFF_TOKEN_TTL', 15 * 60))
+STAFF_TOKEN_REFRESH_WINDOW = int(os.environ.get('STAFF_TOKEN_REFRESH_WINDOW', 12 * 60 * 60))
+
+# Password hashing (see cafe/hashers.py). PASSWORD_HASHER picks the algorithm for
+# new passwords: pbkdf2, scrypt or argon2 (needs argon2-cffi). Stored hashes that
+# use another algorithm or other costs are upgraded on the next login. Use
+# `manage.py bench_login` to see what a setting costs in logins/sec per core.
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2').lower()
+_CAFE_HASHERS = {
+    'pbkdf2': 'cafe.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'cafe.hashers.ScryptPasswordHasher',
+    'argon2': 'cafe.hashers.Argon2PasswordHasher',
+}
+if PASSWORD_HASHER not in _CAFE_HASHERS:
+    raise ImproperlyConfigured(
+        f"PASSWORD_HASHER must be one of {', '.join(_CAFE_HASHERS)}, not {PASSWORD_HASHER!r}"
+    )
+PASSWORD_HASHERS = [_CAFE_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _CAFE_HASHERS.items() if name != PASSWORD_HASHER
+] + [
+    # Remaining Django defaults, so any older hashes still verify
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 1_000_000))
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.environ.get('PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 14))
+PASSWORD_SCRYPT_BLOCK_SIZE = int(os.environ.get('PASSWORD_SCRYPT_BLOCK_SIZE', 8))
+PASSWORD_SCRYPT_PARALLELISM = int(os.environ.get('PASSWORD_SCRYPT_PARALLELISM', 5))
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get('PASSWORD_ARGON2_MEMORY_COST', 102400))
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get('PASSWORD_ARGON2_PARALLELISM', 8))
+
+# Accounts in this auth group may post batched clock events to
+# /api/attendance/sync/ and nothing else a manager can do
+ATTENDANCE_KIOSK_GROUP = os.environ.get('ATTENDANCE_KIOSK_GROUP', 'attendance_kiosk')
+
+# Payroll deductions (see cafe/payroll.py): share of a day's pay lost per late
+# arrival, and approved leave types that are unpaid
+PAYROLL_LATE_DEDUCTION_RATE = os.environ.get('PAYROLL_LATE_DEDUCTION_RATE', '0.1')
+PAYROLL_UNPAID_LEAVE_TYPES = [
+    leave_type.strip() for leave_type in os.environ.get('PAYROLL_UNPAID_LEAVE_TYPES', 'other').split(',') if leave_type.strip()
+]
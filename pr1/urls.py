@@ -20,8 +20,9 @@ from django.conf.urls.static import static
 from rest_framework.routers import DefaultRouter
 from cafe.api_views import (
     MenuItemViewSet, TableViewSet, RoomViewSet, OrderViewSet, RatingViewSet, 
-    BillViewSet, AuthViewSet, DashboardViewSet, FloorViewSet,
-    DepartmentViewSet, RoleViewSet, StaffViewSet, AttendanceViewSet, LeaveViewSet
+    BillViewSet, AuthViewSet, SessionViewSet, DashboardViewSet, FloorViewSet,
+    DepartmentViewSet, RoleViewSet, StaffViewSet, AttendanceViewSet, LeaveViewSet,
+    PayrollRunViewSet, ExportViewSet
 )
 
 # Create router and register viewsets
@@ -35,11 +36,14 @@ router.register(r'roles', RoleViewSet)
 router.register(r'staff', StaffViewSet)
 router.register(r'attendance', AttendanceViewSet)
 router.register(r'leaves', LeaveViewSet)
+router.register(r'payroll', PayrollRunViewSet)
 router.register(r'orders', OrderViewSet)
 router.register(r'ratings', RatingViewSet)
 router.register(r'bills', BillViewSet)
 router.register(r'auth', AuthViewSet, basename='auth')
+router.register(r'session', SessionViewSet, basename='session')
 router.register(r'dashboard', DashboardViewSet, basename='dashboard')
+router.register(r'exports', ExportViewSet, basename='exports')
 
 urlpatterns = [
     path('admin/', admin.site.urls),